@@ -5,6 +5,8 @@ ANSI code → CSS style map for QTextEditLogger.
 You can tweak colors, add 256‐color codes, backgrounds, etc.
 """
 
+import re
+
 style_map = {
     # reset
     '0':             '</span>',
@@ -44,4 +46,38 @@ style_map = {
     '47':            'background-color:white',
     '100':           'background-color:grey',
     '101':           'background-color:lightcoral',
-}
\ No newline at end of file
+}
+
+# Ready-to-insert HTML fragment for each single code
+html_map = {
+    code: ('</span>' if css == '</span>' else f'<span style="{css}">')
+    for code, css in style_map.items()
+}
+
+def combine(codes: list[str]) -> str:
+    """Return one opening <span> for a compound code such as ['1', '31']."""
+    styles = [style_map[c] for c in codes if c in style_map and style_map[c] != '</span>']
+    if styles:
+        return '<span style="' + ';'.join(styles) + '">'
+    return ''
+
+# Matches one SGR escape sequence, e.g. "\x1b[1;31m"
+_ANSI_RE = re.compile(r'\x1b\[([0-9;]+)m')
+
+# Compound sequences ("1;31") → finished HTML; log streams reuse a handful
+_SPAN_CACHE = {}
+
+def _repl(match):
+    seq = match.group(1)
+    if ';' not in seq:
+        return html_map.get(seq, '')
+    span = _SPAN_CACHE.get(seq)
+    if span is None:
+        codes = seq.split(';')
+        span = '</span>' if '0' in codes else combine(codes)
+        _SPAN_CACHE[seq] = span
+    return span
+
+def ansi_to_html(text: str) -> str:
+    """Replace ANSI color codes in text with HTML <span> tags in one pass."""
+    return _ANSI_RE.sub(_repl, text)
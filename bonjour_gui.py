@@ -1,20 +1,54 @@
 #!/usr/bin/env python3
 import sys
 import socket   
+import asyncio
+import threading
+from bisect import bisect_left, insort
+from ipaddress import IPv4Address, IPv6Address
 
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QTreeWidget, QTreeWidgetItem, QHeaderView,
-    QStyledItemDelegate
+    QApplication, QMainWindow, QTreeView, QHeaderView,
+    QStyledItemDelegate, QFrame
+)
+from PyQt6.QtGui import QFont, QFontMetrics, QPainter, QKeySequence
+from PyQt6.QtCore import (
+    QRect, Qt, QThread, QTimer, QSettings, pyqtSignal, QObject,
+    QAbstractItemModel, QModelIndex
 )
-from PyQt6.QtGui import QFont, QPainter, QKeySequence
-from PyQt6.QtCore import QRect, Qt, QThread, pyqtSignal, QObject
 
-from zeroconf import Zeroconf, ServiceBrowser, ServiceListener
+from zeroconf import ServiceStateChange
+from zeroconf.asyncio import AsyncZeroconf, AsyncServiceBrowser, AsyncServiceInfo
 
 from service_labels import labels as human_labels
 
 
+# Shared bold font; built lazily because QFont needs a running QApplication
+_BOLD_FONT = None
+
+def _bold_font():
+    global _BOLD_FONT
+    if _BOLD_FONT is None:
+        _BOLD_FONT = QFont()
+        _BOLD_FONT.setBold(True)
+    return _BOLD_FONT
+
+
 class BoldParenthesisDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # font key -> (bold font, metrics of the regular font)
+        self._font_cache: dict[str, tuple[QFont, QFontMetrics]] = {}
+
+    def _fonts_for(self, font):
+        key = font.toString()
+        cached = self._font_cache.get(key)
+        if cached is None:
+            bold_font = QFont(font)
+            bold_font.setBold(True)
+            cached = (bold_font, QFontMetrics(font))
+            self._font_cache[key] = cached
+        return cached
+
     def paint(self, painter, option, index):
         text = index.data()
         if not text:
@@ -24,10 +58,10 @@ class BoldParenthesisDelegate(QStyledItemDelegate):
             return super().paint(painter, option, index)
         before = text[:i]
         paren = text[i:]
+        bold_font, fm = self._fonts_for(option.font)
         painter.save()
         painter.setFont(option.font)
         rect = option.rect
-        fm = painter.fontMetrics()
         x = rect.x()
         y = rect.y() + fm.ascent() + (rect.height() - fm.height()) // 2
         # Draw before
@@ -35,8 +69,6 @@ class BoldParenthesisDelegate(QStyledItemDelegate):
         painter.drawText(x, y, before)
         width_before = fm.horizontalAdvance(before)
         # Bold for (parenthesis)
-        bold_font = QFont(option.font)
-        bold_font.setBold(True)
         painter.setFont(bold_font)
         painter.drawText(x + width_before, y, paren)
         painter.restore()
@@ -45,53 +77,397 @@ class BoldParenthesisDelegate(QStyledItemDelegate):
 
 # ---- Zeroconf Thread ----
 
-class MDNSListener(QObject, ServiceListener):
-    update = pyqtSignal(dict)  # {stype: {name: info}}
+# Formatted address caches; services re-advertise the same addresses
+_v4_cache: dict[bytes, str] = {}
+_v6_cache: dict[bytes, str] = {}
+
+def _format_addr(raw):
+    """Format a packed IPv4/IPv6 address, memoized per raw value."""
+    if len(raw) == 4:
+        return _v4_cache.get(raw) or _v4_cache.setdefault(raw, str(IPv4Address(raw)))
+    if len(raw) == 16:
+        return _v6_cache.get(raw) or _v6_cache.setdefault(raw, str(IPv6Address(raw)))
+    return raw.hex()
+
+def safe_decode(x):
+    if isinstance(x, bytes):
+        try:
+            return x.decode("utf-8")
+        except Exception:
+            return "0x" + x.hex()
+    return x or ""
+
+def _prepare_info(info):
+    """Attach formatted addresses and decoded TXT pairs to info, off the GUI thread."""
+    try:
+        info._formatted_addrs = tuple(_format_addr(a) for a in info.addresses)
+        info._decoded_props = tuple(
+            (key, value)
+            for key, value in ((safe_decode(k), safe_decode(v)) for k, v in info.properties.items())
+            if key or value
+        )
+    except AttributeError:
+        # Compiled ServiceInfo builds may not accept new attributes
+        pass
+
+class MDNSListener(QObject):
+    # Fine-grained per-service events instead of whole-dict snapshots
+    added = pyqtSignal(str, str, object)    # stype, name, info
+    removed = pyqtSignal(str, str)          # stype, name
+    updated = pyqtSignal(str, str, object)  # stype, name, info
 
     def __init__(self):
-        QObject.__init__(self)
-        ServiceListener.__init__(self)
+        super().__init__()
         self.services = {}
+        # Kept sorted on insert so snapshots never need sorted()
+        self._sorted_types: list[str] = []
+        self._sorted_names: dict[str, list[str]] = {}
+        # snapshot() may be called from the GUI thread
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Return a {stype: {name: info}} copy in sorted order, for on-demand full population."""
+        with self._lock:
+            return {
+                stype: {name: self.services[stype][name] for name in self._sorted_names[stype]}
+                for stype in self._sorted_types
+            }
+
+    def _store(self, stype, name, info):
+        names = self.services.get(stype)
+        if names is None:
+            names = self.services[stype] = {}
+            insort(self._sorted_types, stype)
+            self._sorted_names[stype] = []
+        if name not in names:
+            insort(self._sorted_names[stype], name)
+        names[name] = info
+
+    def store_service(self, stype, name, info, update=False):
+        """Record a resolved ServiceInfo and announce it."""
+        _prepare_info(info)
+        with self._lock:
+            self._store(stype, name, info)
+        if update:
+            self.updated.emit(stype, name, info)
+        else:
+            self.added.emit(stype, name, info)
+
+    def remove_service(self, stype, name):
+        with self._lock:
+            names = self.services.get(stype)
+            if not names or name not in names:
+                return
+            del names[name]
+            order = self._sorted_names[stype]
+            del order[bisect_left(order, name)]
+        self.removed.emit(stype, name)
 
-    def add_service(self, zc, stype, name):
-        info = zc.get_service_info(stype, name)
-        if info:
-            self.services.setdefault(stype, {})[name] = info
-            self.update.emit(self.services.copy())
-
-    def remove_service(self, zc, stype, name):
-        if stype in self.services and name in self.services[stype]:
-            del self.services[stype][name]
-            self.update.emit(self.services.copy())
+class ZeroconfThread(QThread):
+    """Runs every mDNS browser on one asyncio loop instead of a thread per type."""
+    service_added = pyqtSignal(str, str, object)
+    service_removed = pyqtSignal(str, str)
+    service_updated = pyqtSignal(str, str, object)
 
-    def update_service(self, zc, stype, name):
-        self.add_service(zc, stype, name)
+    RESOLVE_TIMEOUT_MS = 3000
 
-class ZeroconfThread(QThread):
-    services_updated = pyqtSignal(dict)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._loop = None
+        self._stop_event = None
+        self._stopping = False
+        self._browsers = []
 
     def run(self):
         # Requires python-zeroconf ≥0.38
-        zc = Zeroconf()
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._browse())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def stop(self):
+        """Ask the browse loop to shut down; safe to call from the GUI thread."""
+        self._stopping = True
+        loop = self._loop
+        if loop is not None and self._stop_event is not None:
+            try:
+                loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+    async def _browse(self):
+        self._stop_event = asyncio.Event()
+        if self._stopping:
+            # stop() arrived before the loop was ready
+            return
+        aiozc = AsyncZeroconf()
         listener = MDNSListener()
-        listener.update.connect(self.emit_update)
-        from time import sleep
-        class TypeListener(ServiceListener):
-            def __init__(self): self.types = set()
-            def add_service(self, zc, st, name): self.types.add(name)
-            def remove_service(self, zc, st, name): pass
-            def update_service(self, zc, st, name): pass
-
-        type_listener = TypeListener()
-        ServiceBrowser(zc, "_services._dns-sd._udp.local.", type_listener)
-        sleep(.5)
-        types = sorted(type_listener.types)
-        for t in types:
-            ServiceBrowser(zc, t, listener)
-        self.exec()
-
-    def emit_update(self, services):
-        self.services_updated.emit(services)
+        listener.added.connect(self.service_added)
+        listener.removed.connect(self.service_removed)
+        listener.updated.connect(self.service_updated)
+        subscribed = set()
+        browsers = self._browsers
+        tasks = set()
+
+        async def resolve(stype, name, update):
+            info = AsyncServiceInfo(stype, name)
+            if await info.async_request(aiozc.zeroconf, self.RESOLVE_TIMEOUT_MS):
+                listener.store_service(stype, name, info, update)
+
+        def on_service(zeroconf, service_type, name, state_change):
+            if state_change is ServiceStateChange.Removed:
+                listener.remove_service(service_type, name)
+                return
+            update = state_change is ServiceStateChange.Updated
+            task = asyncio.ensure_future(resolve(service_type, name, update))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        def on_type(zeroconf, service_type, name, state_change):
+            # Start browsing each service type as soon as it is announced
+            if state_change is ServiceStateChange.Added and name not in subscribed:
+                subscribed.add(name)
+                browsers.append(AsyncServiceBrowser(aiozc.zeroconf, name, handlers=[on_service]))
+
+        browsers.append(AsyncServiceBrowser(
+            aiozc.zeroconf, "_services._dns-sd._udp.local.", handlers=[on_type]
+        ))
+        await self._stop_event.wait()
+
+        # Deterministic teardown: browsers, in-flight lookups, then sockets
+        for browser in browsers:
+            await browser.async_cancel()
+        browsers.clear()
+        for task in list(tasks):
+            task.cancel()
+        await aiozc.async_close()
+
+# ---- Tree model ----
+
+class _Node:
+    """One row of the Bonjour tree; keyed rows keep their children sorted."""
+    __slots__ = ('text', 'bold', 'parent', 'key', 'children', 'keys')
+
+    def __init__(self, text, parent=None, bold=False, key=None):
+        self.text = text
+        self.bold = bold
+        self.parent = parent
+        self.key = key
+        self.children = []
+        self.keys = []  # sorted keys of keyed children, aligned with children
+
+    def row(self):
+        if self.key is not None:
+            return bisect_left(self.parent.keys, self.key)
+        return self.parent.children.index(self)
+
+class BonjourModel(QAbstractItemModel):
+    """local -> service type -> instance -> Host/IP/Port/TXT rows."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = _Node("")
+        self._local = _Node("local", self._root, bold=True)
+        self._root.children.append(self._local)
+        self._types: dict[str, _Node] = {}
+        self._instances: dict[tuple[str, str], _Node] = {}
+
+    # -- QAbstractItemModel interface --
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer().parent
+        if node is None or node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row(), 0, node)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return len(node.children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.text
+        if role == Qt.ItemDataRole.FontRole and node.bold:
+            return _bold_font()
+        return None
+
+    # -- Updates --
+
+    def _index_of(self, node):
+        return self.createIndex(node.row(), 0, node)
+
+    def local_index(self):
+        return self._index_of(self._local)
+
+    def _insert_keyed(self, parent, node):
+        i = bisect_left(parent.keys, node.key)
+        self.beginInsertRows(self._index_of(parent), i, i)
+        parent.keys.insert(i, node.key)
+        parent.children.insert(i, node)
+        self.endInsertRows()
+
+    def _remove_keyed(self, parent, key):
+        i = bisect_left(parent.keys, key)
+        self.beginRemoveRows(self._index_of(parent), i, i)
+        del parent.keys[i]
+        del parent.children[i]
+        self.endRemoveRows()
+
+    def set_instance(self, stype, name, info):
+        """Add or refresh one service instance; return indexes of newly created rows."""
+        created = []
+        type_node = self._types.get(stype)
+        if type_node is None:
+            label = human_labels.get(stype, "")
+            if label:
+                combined_text = f"{stype} ({label})"
+            else:
+                combined_text = stype
+            type_node = _Node(combined_text, self._local, bold=bool(label), key=stype)
+            self._insert_keyed(self._local, type_node)
+            self._types[stype] = type_node
+            created.append(type_node)
+
+        details = _detail_texts(info)
+        instance = self._instances.get((stype, name))
+        if instance is None:
+            instance = _Node(name, type_node, key=name)
+            instance.children = [_Node(text, instance) for text in details]
+            self._insert_keyed(type_node, instance)
+            self._instances[(stype, name)] = instance
+            created.append(instance)
+        else:
+            parent_index = self._index_of(instance)
+            old = len(instance.children)
+            if old == len(details):
+                # Same shape: just relabel rows in place
+                for node, text in zip(instance.children, details):
+                    node.text = text
+                if old:
+                    self.dataChanged.emit(
+                        self.index(0, 0, parent_index),
+                        self.index(old - 1, 0, parent_index)
+                    )
+            else:
+                if old:
+                    self.beginRemoveRows(parent_index, 0, old - 1)
+                    instance.children = []
+                    self.endRemoveRows()
+                self.beginInsertRows(parent_index, 0, len(details) - 1)
+                instance.children = [_Node(text, instance) for text in details]
+                self.endInsertRows()
+        return [self._index_of(node) for node in created]
+
+    def remove_instance(self, stype, name):
+        instance = self._instances.pop((stype, name), None)
+        if instance is None:
+            return
+        type_node = instance.parent
+        self._remove_keyed(type_node, name)
+        if not type_node.children:
+            self._remove_keyed(self._local, stype)
+            del self._types[stype]
+
+    def clear(self):
+        self.beginResetModel()
+        self._local.children = []
+        self._local.keys = []
+        self._types.clear()
+        self._instances.clear()
+        self.endResetModel()
+
+def _detail_texts(info):
+    """Return the Host/IP/Port/TXT row texts for one service instance."""
+    texts = [f"Host: {info.server}"]
+    addrs = getattr(info, '_formatted_addrs', None)
+    if addrs is None:
+        addrs = [_format_addr(a) for a in info.addresses]
+    for ip_str in addrs:
+        texts.append(f"IP: {ip_str}")
+    texts.append(f"Port: {info.port}")
+    props = getattr(info, '_decoded_props', None)
+    if props is None:
+        props = [(safe_decode(k), safe_decode(v)) for k, v in info.properties.items()]
+    for key, value in props:
+        if key or value:
+            texts.append(f"{key} = {value}")
+    return texts
+
+# ---- Theme stylesheets ----
+
+_QSS_DARK = """
+QTreeView {
+    background-color: #222;
+    alternate-background-color: #333;
+    border: 1px solid #555;
+    border-radius: 0;
+    padding: 8px;
+    margin-top: 2px;
+    color: #fafafa;
+}
+QHeaderView::section { background-color: #222; color: #fafafa; }
+"""
+
+_QSS_LIGHT = """
+QTreeView {
+    background-color: #fafafa;
+    alternate-background-color: #f0f0f0;
+    border: 1px solid #bbb;
+    border-radius: 0;
+    padding: 8px;
+    margin-top: 2px;
+    color: #222;
+}
+QHeaderView::section {
+    background-color: #fafafa;
+    color: #222;
+}
+QTreeView::branch {
+    color: black;
+}
+QTreeView::branch:closed:has-children:!has-siblings,
+QTreeView::branch:closed:has-children:has-siblings {
+    border-image: none;
+    image: url("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' width='10' height='10'><polygon points='3,2 7,5 3,8' fill='black'/></svg>");
+}
+QTreeView::branch:open:has-children:!has-siblings,
+QTreeView::branch:open:has-children:has-siblings {
+    border-image: none;
+    image: url("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' width='10' height='10'><polygon points='2,3 5,7 8,3' fill='black'/></svg>");
+}
+QTreeView::item {
+    padding-left: 4px;
+    padding-right: 4px;
+    font-weight: normal;
+}
+QTreeView::item:selected {
+    background-color: #cceeff;
+}
+"""
+
+# "system" uses native painting; no stylesheet
+_QSS_SYSTEM = ""
+
+_THEME_QSS = {'dark': _QSS_DARK, 'light': _QSS_LIGHT, 'system': _QSS_SYSTEM}
 
 # ---- Qt GUI ----
 
@@ -100,9 +476,22 @@ class BonjourWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Discover")
         self.setMinimumSize(340, 480)
-        self.tree = QTreeWidget()
+        self.tree = QTreeView()
+        self.model = BonjourModel(self)
+        self.tree.setModel(self.model)
         self.tree.setHeaderHidden(True)
-        self.tree.setAlternatingRowColors(True)
+        # Alternating row colors cost a brush lookup per row; opt-in only
+        self.settings = QSettings("iNetScan", "ScannerApp")
+        alternating = self.settings.value('bonjour_alternating_rows', False, type=bool)
+        self.tree.setAlternatingRowColors(alternating)
+        # Opaque viewport skips the background erase on each paint
+        self.tree.viewport().setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, True)
+        self.tree.viewport().setAutoFillBackground(True)
+        # Expansion animations repaint every frame during bulk expands
+        self.tree.setAnimated(False)
+        # All rows are single-line text: measure once instead of per row
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.setCentralWidget(self.tree)
 
         # Add "File" menu with Quit
@@ -128,6 +517,11 @@ class BonjourWindow(QMainWindow):
         medium_font_action.triggered.connect(lambda: self.set_font_size(12))
         large_font_action.triggered.connect(lambda: self.set_font_size(14))
 
+        alternating_action = menu.addAction("Alternating Row Colors")
+        alternating_action.setCheckable(True)
+        alternating_action.setChecked(alternating)
+        alternating_action.toggled.connect(self.set_alternating_rows)
+
         refresh_action = refresh_menu.addAction("Refresh Network")
         refresh_action.triggered.connect(self.restart_discovery)
         refresh_action.setShortcuts([QKeySequence("Ctrl+R"), QKeySequence("Meta+R")])
@@ -141,180 +535,104 @@ class BonjourWindow(QMainWindow):
 
         # Set custom delegate for column 0
         self.tree.setItemDelegateForColumn(0, BoldParenthesisDelegate(self.tree))
+        self.tree.expand(self.model.local_index())
 
-        self.tree.setColumnCount(1)
+        # Coalesce bursts of Zeroconf events into one tree update
+        self._pending: dict[tuple[str, str], object] = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(50)
+        self._flush_timer.timeout.connect(self._flush_pending)
 
-        self.zc_thread = ZeroconfThread()
-        self.zc_thread.services_updated.connect(self.update_services)
-        self.zc_thread.start()
+        # Threads still shutting down after a restart
+        self._retiring = []
+        self._start_discovery()
 
     def set_theme(self, mode):
-        if mode == "dark":
-            self.tree.setStyleSheet(
-                """
-                QTreeWidget {
-                    background-color: #222;
-                    alternate-background-color: #333;
-                    border: 1px solid #555;
-                    border-radius: 0;
-                    padding: 8px;
-                    margin-top: 2px;
-                    color: #fafafa;
-                }
-                QHeaderView::section { background-color: #222; color: #fafafa; }
-                """
-            )
-        elif mode == "light":
-            self.tree.setStyleSheet(
-                """
-                QTreeWidget {
-                    background-color: #fafafa;
-                    alternate-background-color: #f0f0f0;
-                    border: 1px solid #bbb;
-                    border-radius: 0;
-                    padding: 8px;
-                    margin-top: 2px;
-                    color: #222;
-                }
-                QHeaderView::section {
-                    background-color: #fafafa;
-                    color: #222;
-                }
-                QTreeView::branch {
-                    color: black;
-                }
-                QTreeView::branch:closed:has-children:!has-siblings,
-                QTreeView::branch:closed:has-children:has-siblings {
-                    border-image: none;
-                    image: url("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' width='10' height='10'><polygon points='3,2 7,5 3,8' fill='black'/></svg>");
-                }
-                QTreeView::branch:open:has-children:!has-siblings,
-                QTreeView::branch:open:has-children:has-siblings {
-                    border-image: none;
-                    image: url("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' width='10' height='10'><polygon points='2,3 5,7 8,3' fill='black'/></svg>");
-                }
-                QTreeWidget::item {
-                    padding-left: 4px;
-                    padding-right: 4px;
-                    font-weight: normal;
-                }
-                QTreeWidget::item:selected {
-                    background-color: #cceeff;
-                }
-                """
-            )
-        elif mode == "system":
-            self.tree.setStyleSheet(
-                """
-                QTreeWidget {
-                    border: 1px solid #555;
-                    border-radius: 0;
-                    padding: 8px;
-                    margin-top: 2px;
-                }
-                """
-            )
+        self.tree.setStyleSheet(_THEME_QSS[mode])
+        self.tree.setFrameShape(QFrame.Shape.StyledPanel)
+        if mode == "system":
+            # Native frame and margins replace the old stylesheet border/padding
+            self.tree.setContentsMargins(8, 2, 0, 0)
+        else:
+            # The stylesheet themes bring their own border and padding
+            self.tree.setContentsMargins(0, 0, 0, 0)
+
+    def set_alternating_rows(self, enabled):
+        self.tree.setAlternatingRowColors(enabled)
+        self.settings.setValue('bonjour_alternating_rows', enabled)
 
     def set_font_size(self, size):
         font = self.tree.font()
         font.setPointSize(size)
         self.tree.setFont(font)
 
-    def get_expanded_paths(self, item=None, path=()):
-        """Recursively collect expanded item paths."""
-        if item is None:
-            expanded = set()
-            for i in range(self.tree.topLevelItemCount()):
-                expanded |= self.get_expanded_paths(self.tree.topLevelItem(i), ())
-            return expanded
-        expanded = set()
-        if item.isExpanded():
-            expanded.add(path + (item.text(0),))
-        for i in range(item.childCount()):
-            expanded |= self.get_expanded_paths(item.child(i), path + (item.text(0),))
-        return expanded
-
-    def restore_expanded_paths(self, expanded_paths, item=None, path=()):
-        """Recursively restore expanded state based on saved paths."""
-        if item is None:
-            for i in range(self.tree.topLevelItemCount()):
-                self.restore_expanded_paths(expanded_paths, self.tree.topLevelItem(i), ())
-            return
-        if path + (item.text(0),) in expanded_paths:
-            item.setExpanded(True)
-        for i in range(item.childCount()):
-            self.restore_expanded_paths(expanded_paths, item.child(i), path + (item.text(0),))
-
-    def update_services(self, services):
-        # --- Save expanded state before clearing ---
-        expanded_paths = self.get_expanded_paths()
-
-        self.tree.clear()
+    def _start_discovery(self):
+        self.zc_thread = ZeroconfThread()
+        queued = Qt.ConnectionType.QueuedConnection
+        self.zc_thread.service_added.connect(self.on_add, queued)
+        self.zc_thread.service_removed.connect(self.on_remove, queued)
+        self.zc_thread.service_updated.connect(self.on_update, queued)
+        self.zc_thread.start()
 
-        # Top level: 'local'
-        local_item = QTreeWidgetItem(["local"])
-        local_font = QFont()
-        local_font.setBold(True)
-        local_item.setFont(0, local_font)
-        self.tree.addTopLevelItem(local_item)
-
-        for stype in sorted(services):
-            label = human_labels.get(stype, "")
-            if label:
-                combined_text = f"{stype} ({label})"
-            else:
-                combined_text = stype
-            type_item = QTreeWidgetItem([combined_text])
-            if label:
-                font = QFont()
-                font.setBold(True)
-                type_item.setFont(0, font)
-            local_item.addChild(type_item)
-            for name, info in sorted(services[stype].items()):
-                instance_item = QTreeWidgetItem([name])
-                type_item.addChild(instance_item)
-                host_item = QTreeWidgetItem([f"Host: {info.server}"])
-                instance_item.addChild(host_item)
-                for addr in info.addresses:
-                    import socket
-                    try:
-                        if len(addr) == 4:
-                            ip_str = socket.inet_ntoa(addr)
-                        elif len(addr) == 16:
-                            ip_str = socket.inet_ntop(socket.AF_INET6, addr)
-                        else:
-                            ip_str = str(addr)
-                    except Exception:
-                        ip_str = str(addr)
-                    ip_item = QTreeWidgetItem([f"IP: {ip_str}"])
-                    instance_item.addChild(ip_item)
-                port_item = QTreeWidgetItem([f"Port: {info.port}"])
-                instance_item.addChild(port_item)
-                for k, v in info.properties.items():
-                    def safe_decode(x):
-                        if isinstance(x, bytes):
-                            try:
-                                return x.decode("utf-8")
-                            except Exception:
-                                return "0x" + x.hex()
-                        return x or ""
-                    key = safe_decode(k)
-                    value = safe_decode(v)
-                    if key or value:
-                        txt_str = f"{key} = {value}"
-                        txt_item = QTreeWidgetItem([txt_str])
-                        instance_item.addChild(txt_item)
-        local_item.setExpanded(True)
-
-        # --- Restore expanded state after rebuilding ---
-        self.restore_expanded_paths(expanded_paths)
+    def on_add(self, stype, name, info):
+        self._queue(stype, name, info)
+
+    def on_update(self, stype, name, info):
+        self._queue(stype, name, info)
+
+    def on_remove(self, stype, name):
+        self._queue(stype, name, None)
+
+    def _queue(self, stype, name, info):
+        # Later events for the same service supersede earlier ones
+        self._pending[(stype, name)] = info
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_pending(self):
+        pending, self._pending = self._pending, {}
+        self.tree.setUpdatesEnabled(False)
+        try:
+            for (stype, name), info in pending.items():
+                if info is None:
+                    self.model.remove_instance(stype, name)
+                else:
+                    for index in self.model.set_instance(stype, name, info):
+                        self.tree.expand(index)
+        finally:
+            self.tree.setUpdatesEnabled(True)
+
+    def _stop_discovery(self):
+        """Stop the current Zeroconf thread without blocking the UI for long."""
+        old = self.zc_thread
+        try:
+            old.service_added.disconnect()
+            old.service_removed.disconnect()
+            old.service_updated.disconnect()
+        except TypeError:
+            pass  # already stopped
+        old.stop()
+        if not old.wait(2000):
+            # Still closing sockets; keep it referenced until it finishes
+            self._retiring.append(old)
+            old.finished.connect(lambda t=old: self._retiring.remove(t))
+
+    def closeEvent(self, event):
+        self._stop_discovery()
+        # Closing must not leave a running QThread behind: wait for every one
+        for t in list(self._retiring):
+            t.wait()
+        self._retiring.clear()
+        super().closeEvent(event)
 
     def restart_discovery(self):
-        self.zc_thread.quit()
-        self.zc_thread.wait()
-        self.zc_thread = ZeroconfThread()
-        self.zc_thread.services_updated.connect(self.update_services)
-        self.zc_thread.start()
+        self._stop_discovery()
+        self._flush_timer.stop()
+        self._pending.clear()
+        self.model.clear()
+        self.tree.expand(self.model.local_index())
+        self._start_discovery()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
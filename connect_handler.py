@@ -1,45 +1,69 @@
 #!/usr/bin/env python3
+import os
 import sys
 import webbrowser
-import subprocess
 
-def main(ip):
-    """
-    Present a simple text menu to choose how to connect to the host.
-    """
-    def raw_socket(host):
+# (menu label, port shown in the menu, action kind)
+_MENU = (
+    ("HTTP", 80, "http"),
+    ("HTTPS", 443, "https"),
+    ("SSH", 22, "ssh"),
+    ("SFTP", 22, "sftp"),
+    ("SMB Share", 445, "smb"),
+    ("CUPS (Printer)", 631, "cups"),
+    ("VNC (Screen Share)", 5900, "vnc"),
+    ("RDP (Remote Desktop)", 3389, "rdp"),
+    ("Webmin", 10000, "webmin"),
+    ("Raw Socket (nc)", None, "nc"),
+)
+
+def _exec_terminal(command):
+    """Replace this process with a terminal running command."""
+    os.execvp("x-terminal-emulator", ["x-terminal-emulator", "-e", command])
+
+def _dispatch(kind, ip):
+    if kind == "http":
+        webbrowser.open(f"http://{ip}")
+    elif kind == "https":
+        webbrowser.open(f"https://{ip}")
+    elif kind == "ssh":
+        _exec_terminal(f"ssh {ip}")
+    elif kind == "sftp":
+        _exec_terminal(f"sftp {ip}")
+    elif kind == "smb":
+        webbrowser.open(f"smb://{ip}")
+    elif kind == "cups":
+        webbrowser.open(f"http://{ip}:631")
+    elif kind == "vnc":
+        webbrowser.open(f"vnc://{ip}")
+    elif kind == "rdp":
+        webbrowser.open(f"rdp://{ip}")
+    elif kind == "webmin":
+        webbrowser.open(f"https://{ip}:10000")
+    elif kind == "nc":
         port = input("Enter port for raw socket: ").strip()
         if port.isdigit():
-            subprocess.run(["x-terminal-emulator", "-e", f"nc {host} {port}"])
+            _exec_terminal(f"nc {ip} {port}")
         else:
             print("Invalid port.")
 
-    options = [
-        ("HTTP", 80, lambda: webbrowser.open(f"http://{ip}")),
-        ("HTTPS", 443, lambda: webbrowser.open(f"https://{ip}")),
-        ("SSH", 22, lambda: subprocess.run(["x-terminal-emulator", "-e", f"ssh {ip}"])),
-        ("SFTP", 22, lambda: subprocess.run(["x-terminal-emulator", "-e", f"sftp {ip}"])),
-        ("SMB Share", 445, lambda: webbrowser.open(f"smb://{ip}")),
-        ("CUPS (Printer)", 631, lambda: webbrowser.open(f"http://{ip}:631")),
-        ("VNC (Screen Share)", 5900, lambda: webbrowser.open(f"vnc://{ip}")),
-        ("RDP (Remote Desktop)", 3389, lambda: webbrowser.open(f"rdp://{ip}")),
-        ("Webmin", 10000, lambda: webbrowser.open(f"https://{ip}:10000")),
-        ("Raw Socket (nc)", None, lambda: raw_socket(ip)),
-    ]
-
+def main(ip):
+    """
+    Present a simple text menu to choose how to connect to the host.
+    """
     print(f"\nConnect to {ip}:")
-    for idx, (name, port, _) in enumerate(options, start=1):
+    for idx, (name, port, _) in enumerate(_MENU, start=1):
         if port:
             print(f" {idx}) {name}  (port {port})")
         else:
             print(f" {idx}) {name}")
-    choice = input("\nSelect an option [1-{}]: ".format(len(options))).strip()
+    choice = input("\nSelect an option [1-{}]: ".format(len(_MENU))).strip()
 
     try:
         idx = int(choice) - 1
-        if 0 <= idx < len(options):
-            _, port, action = options[idx]
-            action()
+        if 0 <= idx < len(_MENU):
+            _, port, kind = _MENU[idx]
+            _dispatch(kind, ip)
         else:
             print("Invalid selection.")
     except ValueError:
@@ -1,18 +1,37 @@
 #!/usr/bin/env python3
 import csv, json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 input_csv  = 'oui.csv'          # your downloaded IEEE CSV
 output_json = 'oui_extra.json'  # the file iNetScan will load
 
+_no_dash = str.maketrans('', '', '-')
+
 mapping = {}
+mapping_setitem = mapping.__setitem__
 with open(input_csv, newline='', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
+    reader = csv.reader(f)
+    header = next(reader)
+    assign_idx = header.index('Assignment')
+    org_idx = header.index('Organization Name')
     for row in reader:
-        prefix = row['Assignment'].replace('-', '').upper()
-        vendor = row['Organization Name'].strip()
-        mapping[prefix] = vendor
+        prefix = row[assign_idx].translate(_no_dash).upper()
+        vendor = row[org_idx]
+        # Only pay for strip() when there is whitespace to remove
+        if vendor and (vendor[0].isspace() or vendor[-1].isspace()):
+            vendor = vendor.strip()
+        mapping_setitem(prefix, vendor)
 
-with open(output_json, 'w', encoding='utf-8') as f:
-    json.dump(mapping, f, indent=2, ensure_ascii=False)
+if orjson:
+    with open(output_json, 'wb') as f:
+        f.write(orjson.dumps(mapping, option=orjson.OPT_INDENT_2))
+else:
+    # iNetScan only reads this file back, so skip pretty-printing
+    with open(output_json, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, ensure_ascii=False, separators=(',', ':'))
 
 print(f"✅ Wrote {len(mapping)} entries to {output_json}")
\ No newline at end of file
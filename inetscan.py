@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 
 # --- Standard library imports ---
+import bisect
+import collections
 import csv
+import functools
 import html
 import ipaddress
 import json
@@ -9,26 +12,24 @@ import logging
 import os
 import re
 import shutil
-import socket
 import subprocess
 import sys
-import tempfile
 import threading
 import time
 import xml.etree.ElementTree as ET
 
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QTreeWidget, QTreeWidgetItem,
+    QApplication, QMainWindow, QWidget, QTreeView,
     QScrollArea, QSplitter, QToolBar, QLineEdit, QPushButton,
     QLabel, QFormLayout, QVBoxLayout, QHBoxLayout, QGridLayout,
     QGroupBox, QMenuBar, QMessageBox, QDialog, QDialogButtonBox,
     QProgressBar, QSizePolicy, QRadioButton, QButtonGroup, QScrollBar,
     QFileDialog, QFrame, QListWidget, QListWidgetItem, QTextEdit,
-    QTabWidget, QSystemTrayIcon, QStyle
+    QTabWidget, QSystemTrayIcon, QStyle, QCheckBox, QSpinBox
 )
 from PyQt6.QtCore import (
     Qt, QThread, pyqtSignal, pyqtSlot, QSize, QSettings, QEvent, QTimer, QObject,
-    QProcess
+    QProcess, QThreadPool, QUrl, QAbstractListModel, QModelIndex
 )
 from PyQt6.QtGui import (
     QIcon, QAction, QTextCursor, QFont, QDesktopServices, QPainter, QFontMetrics
@@ -45,24 +46,39 @@ class ElidedLabel(QLabel):
         )
         # Allow focus by click so keyboard copy works
         self.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
+        # Font metrics and the last elision, rebuilt only when needed
+        self._fm = QFontMetrics(self.font())
+        self._elided_key = None
+        self._elided = ''
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            self._fm = QFontMetrics(self.font())
+            self._elided_key = None
+        super().changeEvent(event)
 
     def paintEvent(self, event):
         # When focused or has selected text, use default QLabel rendering to allow copy/select
         if self.hasFocus() or self.hasSelectedText():
             super().paintEvent(event)
         else:
-            painter = QPainter(self)
-            fm = QFontMetrics(self.font())
             # Compute elided text based on current width
-            elided = fm.elidedText(self.text(), Qt.TextElideMode.ElideRight, self.width())
-            painter.drawText(self.rect(), self.alignment(), elided)
+            key = (self.text(), self.width())
+            if key != self._elided_key:
+                self._elided_key = key
+                self._elided = self._fm.elidedText(key[0], Qt.TextElideMode.ElideRight, key[1])
+            painter = QPainter(self)
+            painter.drawText(self.rect(), self.alignment(), self._elided)
 from bonjour_gui import BonjourWindow
 
 # --- Local imports ---
-from ansi_style_map import style_map
-from threads import OSDetectThread, HostPortThread
-from scanning import ScanThread, get_privilege_wrapper
-from mdns import MDNSWorker
+from ansi_style_map import ansi_to_html
+from threads import OSDetectTask, HostPortTask, MDNSMergeTask, set_max_concurrency, COMMON_PORTS, QUICK_PORTS, SERVICE_NAMES
+from scanning import (
+    ScanThread, get_privilege_wrapper, neighbor_table_command, parse_neighbor_table,
+    load_json, oui_table, lookup_oui
+)
+from mdns import MDNSWorker, MDNS_RECORD_TTL, load_mdns_cache, save_mdns_cache
 
 # --- Optional dependencies ---
 try:
@@ -70,6 +86,11 @@ try:
 except ImportError:
     pd = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 try:
     from manuf import MacParser
     mac_parser = MacParser()
@@ -83,6 +104,24 @@ def _remove_empty_mdns_model_keys(host):
     if '' in host.get('mdns_props', {}):
         host['mdns_props'].pop('', None)
 
+def _normalize_host_keys(host):
+    """
+    Cache the normalized MAC prefix, model and vendor keys used for icon
+    selection on the host dict. Call again whenever mac/model/vendor or
+    mdns_props change. Underscore keys are dropped from saved records.
+    """
+    mdns_props = host.get('mdns_props', {})
+    # Use host['model'] (cleaned of vendor prefix) before falling back to raw mDNS props
+    model = host.get('model') or mdns_props.get('model') or mdns_props.get('md', '')
+    vendor = host.get('vendor', '') or mdns_props.get('vn', '')
+    mac = host.get('mac', '')
+    host['_mac_prefix'] = mac.translate(_MAC_CLEAN).upper()[:6] if mac else ''
+    host['_model_key'] = model.strip() if model else ''
+    host['_vendor_key'] = vendor.strip() if vendor else ''
+    # strip, lowercase, replace commas and spaces with underscores
+    host['_model_norm'] = (host.get('model') or '').strip().lower().replace(',', '_').replace(' ', '_')
+    host['_vendor_norm'] = (host.get('vendor') or '').strip().lower().replace(',', '_').replace(' ', '_')
+
 # --- Logging setup ---
 logging.basicConfig(level=logging.DEBUG, format='[%(levelname)s] %(message)s')
 log = logging.getLogger(__name__)
@@ -132,7 +171,31 @@ pattern_ansi_map.update({
     r":\s*'[^']*'": "96",
 })
 
+# All highlight patterns fused into one alternation; group i maps to _PATTERN_CODES[i]
+_PATTERN_RX = re.compile(
+    "|".join(f"(?P<g{i}>{pat})" for i, pat in enumerate(pattern_ansi_map)),
+    re.IGNORECASE
+)
+_PATTERN_CODES = list(pattern_ansi_map.values())
+_DETECTED_OS_RX = re.compile(r"Detected OS for [^:]+: (.+)")
+
+def _highlight_match(m):
+    return f"\x1b[{_PATTERN_CODES[m.lastindex - 1]}m{m.group(0)}\x1b[0m"
+
 # --- ConnectDialog definition ---
+# port → (title, prefer service name as title, action text, URL template;
+# None opens an SSH terminal instead)
+PORT_ACTIONS = {
+    80:    ("HTTP", True, "Open in Browser", "http://{ip}:{port}"),
+    443:   ("HTTP", True, "Open in Browser", "http://{ip}:{port}"),
+    22:    ("SSH", True, "Open in Terminal", None),
+    139:   ("SMB Share", False, "Open File Browser", "smb://{ip}"),
+    445:   ("SMB Share", False, "Open File Browser", "smb://{ip}"),
+    5900:  ("VNC (Screen Share)", False, "Open VNC", "vnc://{ip}:{port}"),
+    3389:  ("RDP (Remote Desktop)", False, "Open RDP", "rdp://{ip}:{port}"),
+    10000: ("Webmin", False, "Open in Browser", "https://{ip}:{port}"),
+}
+
 class ConnectDialog(QDialog):
     def __init__(self, parent, ip, ports):
         super().__init__(parent)
@@ -145,21 +208,11 @@ class ConnectDialog(QDialog):
         for entry in ports:
             port = entry['port'] if isinstance(entry, dict) else entry
             name = entry.get('name', '') if isinstance(entry, dict) else ''
-            if port in (80, 443):
-                label = f"{name or 'HTTP'} ({port}) → Open in Browser"
-            elif port == 22:
-                label = f"{name or 'SSH'} ({port}) → Open in Terminal"
-            elif port in (139, 445):
-                label = f"SMB Share ({port}) → Open File Browser"
-            elif port == 5900:
-                label = f"VNC (Screen Share) ({port}) → Open VNC"
-            elif port == 3389:
-                label = f"RDP (Remote Desktop) ({port}) → Open RDP"
-            elif port == 10000:
-                label = f"Webmin ({port}) → Open in Browser"
-            else:
+            action = PORT_ACTIONS.get(port)
+            if action is None:
                 continue
-            item = QListWidgetItem(label)
+            title, use_name, verb, _ = action
+            item = QListWidgetItem(f"{(use_name and name) or title} ({port}) → {verb}")
             item.setData(Qt.ItemDataRole.UserRole, port)
             self.list.addItem(item)
 
@@ -180,76 +233,68 @@ class ConnectDialog(QDialog):
     def on_item(self, item):
         port = item.data(Qt.ItemDataRole.UserRole)
         ip = self.windowTitle().split()[-1]
-        if port in (80, 443):
-            url = f"http://{ip}:{port}"
-            QDesktopServices.openUrl(QUrl(url))
-        elif port == 22:
+        url = PORT_ACTIONS[port][3]
+        if url is None:
             QProcess.startDetached("x-terminal-emulator", ["-e", f"ssh {ip}"])
-        elif port in (139, 445):
-            QDesktopServices.openUrl(QUrl(f"smb://{ip}"))
-        elif port == 5900:
-            QDesktopServices.openUrl(QUrl(f"vnc://{ip}:{port}"))
-        elif port == 3389:
-            QDesktopServices.openUrl(QUrl(f"rdp://{ip}:{port}"))
-        elif port == 10000:
-            QDesktopServices.openUrl(QUrl(f"https://{ip}:{port}"))
+        else:
+            QDesktopServices.openUrl(QUrl(url.format(ip=ip, port=port)))
         self.accept()
 # --- vendor lookup via MAC OUI ---
-# --- supplemental OUI vendor overrides (including custom mac_overrides.json) ---
+# OUI overrides (oui_extra.json, mac_overrides.json) and the Apple
+# OUI-to-model map are loaded once by scanning and shared here
 script_dir = os.path.dirname(os.path.abspath(__file__))
-extra_oui = {}
-for fname in ('oui_extra.json', 'mac_overrides.json'):
-    path = os.path.join(script_dir, fname)
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        log.debug(f"OUI overrides file not found: {path}")
-        continue
-    except json.JSONDecodeError as e:
-        log.warning(f"Failed to parse {path}: {e}")
-        continue
-    except Exception as e:
-        log.error(f"Error loading {path}: {e}")
-        continue
-    # if we reach here, data is loaded
-    log.debug(f"Loaded {len(data)} entries from {path}")
-    for k, v in data.items():
-        key = k.upper().replace('-', '').replace(':', '')
-        extra_oui[key] = v
-
- # --- supplemental Apple OUI-to-model mapping for HomePod detection ---
-apple_models_path = os.path.join(script_dir, 'apple_models.json')
-try:
-    with open(apple_models_path, 'r', encoding='utf-8') as f:
-        apple_model_map = {
-            k.upper().replace('-', '').replace(':', ''): v
-            for k, v in json.load(f).items()
-        }
-except Exception:
-    apple_model_map = {}
+# Strips MAC/OUI separators in a single pass
+_MAC_CLEAN = str.maketrans('', '', '-:.\t ')
+log.debug(f"Loaded {len(oui_table)} OUI override entries")
+
+@functools.lru_cache(maxsize=4096)
+def _lookup_vendor_oui(oui):
+    clean = oui.translate(_MAC_CLEAN)
+    vendor = mac_parser.get_manufacturer(f"{oui}:00:00:00") if mac_parser else None
+    return vendor or lookup_oui(clean)[0]
+
+def lookup_vendor(mac):
+    """Vendor name for a MAC, memoized per 24-bit OUI."""
+    return _lookup_vendor_oui(mac[:8].upper().replace('-', ':'))
 
 # --- supplemental Bonjour model → icon mapping ---
 mdns_models_path = os.path.join(script_dir, 'mdns_models.json')
 try:
-    with open(mdns_models_path, 'r', encoding='utf-8') as f:
-        mdns_model_map = {k: v for k, v in json.load(f).items()}
+    mdns_model_map = load_json(mdns_models_path)
 except Exception:
     mdns_model_map = {}
 
 # --- supplemental explicit icon filename mapping ---
 icon_map_path = os.path.join(script_dir, 'icon_map.json')
 try:
-    with open(icon_map_path, 'r', encoding='utf-8') as f:
-        icon_map = json.load(f)
+    icon_map = load_json(icon_map_path)
 except Exception:
     icon_map = {}
 
-# Remove any empty-string model keys from mdns_props
+class _LogFlushScheduler(QObject):
+    """Lives in the GUI thread; turns cross-thread wakeups into one delayed flush."""
+    wakeup = pyqtSignal()
+
+    def __init__(self, flush, parent=None):
+        super().__init__(parent)
+        self._flush = flush
+        self.wakeup.connect(self._schedule)
+
+    def _schedule(self):
+        QTimer.singleShot(50, self._flush)
+
 class QTextEditLogger(logging.Handler):
+    # Ring buffer size; matches the log area's maximum line count
+    MAX_PENDING = 500
+
     def __init__(self, widget):
         super().__init__()
         self.widget = widget
+        # Records may arrive from worker threads; drained on the GUI thread
+        self._queue = collections.deque(maxlen=self.MAX_PENDING)
+        self._queue_lock = threading.Lock()
+        self._flush_pending = False
+        self._scheduler = _LogFlushScheduler(self._flush, widget)
 
     def emit(self, record):
         msg = self.format(record)
@@ -269,107 +314,346 @@ class QTextEditLogger(logging.Handler):
 
         # Highlight the OS string in Detected OS messages
         if "Detected OS for" in msg:
-            try:
-                m = re.search(r"Detected OS for [^:]+: (.+)", msg)
-                if m:
-                    os_str = m.group(1)
-                    # Wrap just the OS name/details in yellow
-                    msg = msg.replace(os_str, f"\x1b[33m{os_str}\x1b[0m", 1)
-            except re.error:
-                pass
-
-        # Apply pattern-based ANSI highlighting
-        for pat, pcode in pattern_ansi_map.items():
-            try:
-                msg = re.sub(pat, lambda m: f"\x1b[{pcode}m{m.group(0)}\x1b[0m", msg, flags=re.IGNORECASE)
-            except re.error:
-                pass
+            m = _DETECTED_OS_RX.search(msg)
+            if m:
+                os_str = m.group(1)
+                # Wrap just the OS name/details in yellow
+                msg = msg.replace(os_str, f"\x1b[33m{os_str}\x1b[0m", 1)
 
-        html_msg = html.escape(msg)
-        ansi_escape = re.compile(r'\x1b\[([0-9;]+)m')
+        # Apply pattern-based ANSI highlighting in a single pass
+        msg = _PATTERN_RX.sub(_highlight_match, msg)
 
-        def _ansi_to_html(match):
-            codes = match.group(1).split(';')
-            if '0' in codes:
-                return '</span>'
-            styles = [style_map[c] for c in codes if c in style_map]
-            if styles:
-                return f'<span style="{";".join(styles)}">'
-            return ''
-
-        html_msg = ansi_escape.sub(_ansi_to_html, html_msg)
+        html_msg = ansi_to_html(html.escape(msg))
         # Ensure monospaced font for HTML
         html_msg = f'<span style="font-family: monospace; font-size:10pt;">{html_msg}</span>'
 
-        # Trim old lines if document grows too large
-        doc = self.widget.document()
-        if doc.blockCount() > 500:
-            cursor = QTextCursor(doc)
-            cursor.movePosition(QTextCursor.Start)
-            cursor.select(QTextCursor.LineUnderCursor)
-            cursor.removeSelectedText()
-            cursor.deleteChar()
-        # Schedule UI update on the main thread to prevent crashes
-        def append_and_scroll(msg=html_msg):
-            self.widget.insertHtml(msg + '<br>')
-            # Move cursor to the end to ensure new text is visible
-            cursor = self.widget.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.End)
-            self.widget.setTextCursor(cursor)
-            self.widget.ensureCursorVisible()
-            # Scroll to the bottom after inserting
-            sb = self.widget.verticalScrollBar()
-            sb.setValue(sb.maximum())
-        QTimer.singleShot(0, append_and_scroll)
-
-
-
-# Load up to 1000 ports and their names from nmap-services
-
-def load_top_ports():
-    import os
-    ports = []
-    names = {}
-    service_paths = [
-        '/usr/share/nmap/nmap-services',
-        '/usr/local/share/nmap/nmap-services',
-        '/opt/homebrew/share/nmap/nmap-services'
-    ]
-    svc_file = next((p for p in service_paths if os.path.exists(p)), None)
-    if not svc_file:
-        if DEBUG:
-            logging.warning("nmap-services file not found; default RustScan port list will be used")
-        return [], {}
-    try:
-        with open(svc_file, 'r') as f:
-            for line in f:
-                if line.startswith('#'):
-                    continue
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-                name = parts[0]
-                port_proto = parts[1]
-                if '/tcp' not in port_proto:
-                    continue
-                port = int(port_proto.split('/')[0])
-                ports.append(port)
-                names[port] = name
-    except Exception:
-        if DEBUG:
-            logging.warning(f"failed to read {svc_file}; using default RustScan ports")
-        return [], {}
-    return ports, names
+        # Queue for the next coalesced flush on the main thread
+        with self._queue_lock:
+            self._queue.append(html_msg)
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+        self._scheduler.wakeup.emit()
+
+    def _flush(self):
+        with self._queue_lock:
+            pending = list(self._queue)
+            self._queue.clear()
+            self._flush_pending = False
+        if not pending:
+            return
+        # One block per record so setMaximumBlockCount trims whole lines;
+        # a single edit block keeps it to one layout pass
+        cursor = self.widget.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        for i, msg in enumerate(pending):
+            if i or not self.widget.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertHtml(msg)
+        cursor.endEditBlock()
+        # Move cursor to the end to ensure new text is visible
+        self.widget.setTextCursor(cursor)
+        self.widget.ensureCursorVisible()
+        # Scroll to the bottom after inserting
+        sb = self.widget.verticalScrollBar()
+        sb.setValue(sb.maximum())
+
+
+
+# Port lists and service names are loaded once by threads and shared here
 
-COMMON_PORTS, SERVICE_NAMES = load_top_ports()
-# Top 1000 common ports for Quick scan
-QUICK_PORTS = COMMON_PORTS[:1000]
+# Shared stand-in for a host without mDNS TXT properties; never mutated
+_NO_PROPS = {}
+
+@functools.lru_cache(maxsize=None)
+def _port_entry(port):
+    """Shared {'port', 'name'} entry for a bare port number; treat it as read-only."""
+    return {'port': port, 'name': SERVICE_NAMES.get(port, '')}
 
 
 ICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons", "png")
 DEFAULT_ICON = os.path.join(ICON_PATH, "network-server.png")
+ICONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+# Every file under icons/, icons/png and icons/svg as a relative path,
+# scanned once so icon selection is set lookups rather than stat() calls
+def _scan_icon_files():
+    files = set()
+    for sub in ('', 'png', 'svg'):
+        try:
+            with os.scandir(os.path.join(ICONS_DIR, sub)) as it:
+                files.update(os.path.join(sub, e.name) for e in it if e.is_file())
+        except OSError:
+            pass
+    return frozenset(files)
+
+_ICON_FILES = _scan_icon_files()
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_icon(mapped_name):
+    """Absolute path of the first existing svg/png/jpeg/jpg variant, or None."""
+    for rel in (
+        os.path.join('svg', f"{mapped_name}.svg"),
+        os.path.join('png', f"{mapped_name}.png"),
+        f"{mapped_name}.jpeg",
+        f"{mapped_name}.jpg",
+        os.path.join('png', f"{mapped_name}.jpeg"),
+        os.path.join('png', f"{mapped_name}.jpg"),
+    ):
+        if rel in _ICON_FILES:
+            return os.path.join(ICONS_DIR, rel)
+    return None
+
+_RE_NONALNUM = re.compile(r'[^a-z0-9_]')
+_RE_NONALNUMDASH = re.compile(r'[^a-z0-9_-]')
+_RE_UNDERS = re.compile(r'_+')
+
+@functools.lru_cache(maxsize=1024)
+def _sanitize_vendor(vendor):
+    """Vendor name as an icon base filename (e.g. 'Raspberry Pi' -> 'raspberry_pi')."""
+    name = _RE_NONALNUM.sub('_', vendor.lower().replace(' ', '_'))
+    return _RE_UNDERS.sub('_', name).strip('_')
+
+def _sanitize_hostname(hostname):
+    """First label of a host name as an icon base filename."""
+    # lowercase, replace spaces with underscores, strip domain parts
+    name = _RE_NONALNUMDASH.sub('_', hostname.split('.')[0].lower().replace(' ', '_'))
+    return _RE_UNDERS.sub('_', name).strip('_')
+
+def _has_icon(name, exts=('png', 'svg')):
+    return any(os.path.join(ext, f"{name}.{ext}") in _ICON_FILES for ext in exts)
+
+@functools.lru_cache(maxsize=4096)
+def _select_icon_name(mac_prefix, model_key, vendor_key, rdns, mdns):
+    """
+    Prioritized icon base name for a host:
+    0. OUI/mac-prefix specific icon (highest priority)
+    1. model-based (e.g. appletv14,1.svg)
+    2. mdns_models and apple_models dicts
+    4. vendor name image (e.g. eero.png)
+    5. hostname/localhostname
+    6. default icon (network-server)
+    """
+    # 0. OUI/mac-prefix specific icon (highest priority)
+    if mac_prefix and _has_icon(mac_prefix.lower(), ('png',)):
+        return mac_prefix.lower()
+
+    # 1. Model-based (direct filename match, e.g. appletv14,1.svg)
+    if model_key:
+        model_filename = model_key.lower().replace(',', '_').replace(' ', '_')
+        if _has_icon(model_filename):
+            return model_filename
+
+    # 2. mdns_models dict (underscore-normalized), then case-insensitive, then apple_models
+    norm_key = model_key.lower().replace(" ", "_")
+    if norm_key in mdns_model_map:
+        return mdns_model_map[norm_key]
+    for mk, val in mdns_model_map.items():
+        if mk.lower() == model_key.lower():
+            return val
+    # Apple models come packed into the cached OUI table
+    apple_model = lookup_oui(mac_prefix)[1]
+    if apple_model:
+        return apple_model
+
+    # 4. Vendor name image (e.g. eero, raspberry_pi, raspberry_pi_foundation)
+    if vendor_key:
+        vendor_filename = _sanitize_vendor(vendor_key)
+        if _has_icon(vendor_filename):
+            return vendor_filename
+        # Strip common suffixes and retry
+        for suffix in ('_foundation', '_trading', '_inc', '_llc'):
+            if vendor_filename.endswith(suffix):
+                alt = vendor_filename[: -len(suffix)]
+                if _has_icon(alt):
+                    return alt
+
+    # 5. Hostname/localhostname fallback (e.g. eero-pro-6e-0naw.png)
+    for hn in dict.fromkeys(h for h in (rdns, mdns) if h):
+        sanitized = _sanitize_hostname(hn)
+        if _has_icon(sanitized, ('png',)):
+            return sanitized
+
+    # 6. Default fallback
+    return "network-server"
+
+def assign_icon_to_host(host):
+    # Robust multi-tier fallback: model-specific, vendor-generic, vendor-printer generic, then default
+    if 'icon_path' in host and host['icon_path']:
+        return  # Icon already set
+    model_key = (host.get('model') or "").lower().replace(" ", "_")
+    vendor_key = (host.get('vendor') or "").lower()
+    icon_candidates = [
+        f"{model_key}.png" if model_key else None,
+        f"{vendor_key}.png" if vendor_key else None,
+        f"{vendor_key}_printer.png" if vendor_key else None,
+        "network-server.png"
+    ]
+    icon_name = next(
+        (name for name in icon_candidates if name and os.path.join('png', name) in _ICON_FILES),
+        "network-server.png"
+    )
+    host['icon_path'] = os.path.join(ICON_PATH, icon_name)
+
+def get_icon_path(host):
+    # Return Apple icon if vendor is Apple
+    if host.get("vendor", "").lower() == "apple":
+        return "icons/png/apple.png"
+    # fallback to default icon
+    return DEFAULT_ICON
+
+# Fields a discovery result may fill in on a host that is already listed
+_DISCOVERY_KEYS = ('hostname', 'mac', 'vendor', 'model')
+
+# Host fields written by merge_mdns_results
+_MDNS_MERGE_KEYS = (
+    'mdns_name', 'mdns_services', 'mdns_props', 'model', 'icon_path',
+    '_mac_prefix', '_model_key', '_vendor_key', '_model_norm', '_vendor_norm',
+)
+
+def merge_mdns_results(hosts, results):
+    """
+    Merge final mDNS results into host records and resolve their icons.
+    Pure data work with no widget access, so it can run off the GUI thread.
+    """
+    for host in hosts:
+        mdns = results.get(host.get('ip'))
+        if mdns:
+            host['mdns_name'] = mdns.get('hostname', '')
+            host['mdns_services'] = mdns.get('services', [])
+            if 'mdns_props' in mdns:
+                host['mdns_props'] = dict(mdns['mdns_props'])
+                # Merge mDNS model into host['model']
+                md_val = (
+                    host['mdns_props'].get('model')
+                    or host['mdns_props'].get('md')
+                    or host['mdns_props'].get('am')     # Apple Bonjour key
+                    or host['mdns_props'].get('ty')     # e.g. 'XEROX WorkCentre 3335'
+                    or host['mdns_props'].get('product')  # optional fallback
+                    or ''
+                )
+                vendor_prefix = host.get('vendor', '').upper() + ' '
+                if md_val.upper().startswith(vendor_prefix):
+                    md_val = md_val[len(vendor_prefix):]
+                if md_val and md_val not in {'0', '0,1,2'}:
+                    host['model'] = md_val
+        else:
+            host['mdns_name'] = ''
+            host['mdns_services'] = []
+            host['mdns_props'] = {}
+        _normalize_host_keys(host)
+        assign_icon_to_host(host)
+        host["icon_path"] = host.get("icon_path", get_icon_path(host))
+        # Retry fallback icon assignment if icon_path used network-server.png
+        # but the comma/space-normalized model or vendor has an icon
+        if host.get("icon_path", "").endswith("network-server.png"):
+            model = host['_model_norm']
+            vendor = host['_vendor_norm']
+            candidates = ([f"{model}.png"] if model else []) + (
+                [f"{vendor}.png", f"{vendor}_printer.png"] if vendor else [])
+            used_icon = next((n for n in candidates if os.path.join('png', n) in _ICON_FILES), None)
+            if used_icon:
+                host["icon_path"] = os.path.join(ICON_PATH, used_icon)
+                log.debug(f"[ICON] Reassigned valid icon after fallback: {host['icon_path']}")
+    return hosts
+
+class HostsModel(QAbstractListModel):
+    """
+    List model behind the Hosts view. Each row holds the host dict together
+    with its precomputed label and icon, so painting never reruns the
+    icon-selection chain.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []          # [host, label, icon]
+        self._row_by_ip = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        host, label, icon = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return label
+        if role == Qt.ItemDataRole.DecorationRole:
+            return icon
+        if role == Qt.ItemDataRole.UserRole:
+            return host['ip']
+        return None
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._row_by_ip = {}
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """Append (host, label, icon) rows with a single insert notification."""
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for i, (host, label, icon) in enumerate(rows, first):
+            self._rows.append([host, label, icon])
+            self._row_by_ip[host['ip']] = i
+        self.endInsertRows()
+
+    def has_ip(self, ip):
+        return ip in self._row_by_ip
+
+    def index_of(self, ip):
+        row = self._row_by_ip.get(ip)
+        return QModelIndex() if row is None else self.index(row)
+
+    def label_at(self, row):
+        return self._rows[row][1]
+
+    def update_rows(self, rows):
+        """Replace label and icon of existing (host, label, icon) rows; one dataChanged."""
+        changed = []
+        for host, label, icon in rows:
+            row = self._row_by_ip.get(host['ip'])
+            if row is not None:
+                self._rows[row][1:] = [label, icon]
+                changed.append(row)
+        if changed:
+            self.dataChanged.emit(
+                self.index(min(changed)), self.index(max(changed)),
+                [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.DecorationRole]
+            )
+
+    def set_icon(self, ip, icon):
+        row = self._row_by_ip.get(ip)
+        if row is not None:
+            self._rows[row][2] = icon
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole])
+
+# Columns of the CSV/XLSX export
+_EXPORT_FIELDS = ('ip', 'hostname', 'mac', 'vendor', 'ports')
+
+def _export_row(h):
+    """Positional CSV/XLSX row for a host; ports flattened to "22;80;443"."""
+    ports_str = ';'.join(str(p['port']) if isinstance(p, dict) else str(p) for p in h.get('ports', ()))
+    return (h.get('ip', ''), h.get('hostname', ''), h.get('mac', ''), h.get('vendor', ''), ports_str)
+
+# Window-wide stylesheet; widgets are matched by object name
+_WINDOW_QSS = """
+QPushButton#globeBtn { padding: 4px; }
+QTextEdit#logArea { border: none; }
+QStatusBar, QStatusBar * { color: #999999; }
+"""
 
 class ScannerWindow(QMainWindow):
+    # Deep-scan discovery passes as (nmap probe flags, status label). All
+    # probe types go in one nmap run: it sends them in parallel and dedups
+    # per host, instead of sweeping the subnet once per probe type.
+    _SCAN_PASSES = [
+        (['-PR', '-PE', '-PS80,443', '-PU53'], 'Combined discovery'),
+    ]
+
     def toggle_log(self):
         """
         Toggle visibility of the log area in the detail pane.
@@ -388,12 +672,12 @@ class ScannerWindow(QMainWindow):
         """
         Open the ConnectDialog for the currently selected host.
         """
-        current = self.tree.currentItem()
-        if not current:
+        current = self.tree.currentIndex()
+        if not current.isValid():
             return
-        ip = current.data(0, Qt.ItemDataRole.UserRole)
+        ip = current.data(Qt.ItemDataRole.UserRole)
         # Retrieve ports list for this host
-        host = next((h for h in self.hosts if h.get('ip') == ip), {})
+        host = self._host_by_ip.get(ip, {})
         ports = host.get('ports', [])
         # Launch the dialog
         dlg = ConnectDialog(self, ip, ports)
@@ -403,11 +687,10 @@ class ScannerWindow(QMainWindow):
         Validate that the given string is a proper CIDR subnet (e.g., '192.168.1.0/24').
         """
         try:
-            import ipaddress
             # Strict=False allows networks like '192.168.1.1/24'
             ipaddress.ip_network(subnet, strict=False)
             return True
-        except (ValueError, ImportError):
+        except ValueError:
             return False
 
     @pyqtSlot(str)
@@ -431,6 +714,22 @@ class ScannerWindow(QMainWindow):
         # Update status bar and reset UI controls
         self.statusBar().showMessage("Error")
         self.reenable_scan_buttons()
+
+    @pyqtSlot(str, str)
+    def on_scan_warning(self, target, msg):
+        """Surface a scanner note (e.g. its file limit capping speed) without failing the scan."""
+        log.warning(f"[WARN] {target}: {msg}")
+        try:
+            if hasattr(self, 'tray_icon') and self.tray_icon.isVisible():
+                self.tray_icon.showMessage(
+                    "Port Scan Warning",
+                    msg,
+                    QSystemTrayIcon.MessageIcon.Warning
+                )
+        except Exception as e:
+            log.warning(f"Notification failed: {e}")
+        self.statusBar().showMessage(f"Port scan warning: {msg}", 10000)
+
     def normalize_host_metadata(self, host):
         # Guard for invalid host
         if not host or not isinstance(host, dict):
@@ -444,35 +743,13 @@ class ScannerWindow(QMainWindow):
         if host.get('model') in bad_models:
             host['model'] = ''
         if host.get('vendor') == 'Unknown' and host.get('mac'):
-            if 'lookup_vendor' in globals():
-                host['vendor'] = lookup_vendor(host['mac'])
+            host['vendor'] = lookup_vendor(host['mac'])
         # Removed stray debug print for icon_path assignment.
     def assign_icon_to_host(self, host):
-        # Robust multi-tier fallback: model-specific, vendor-generic, vendor-printer generic, then default
-        if 'icon_path' in host and host['icon_path']:
-            return  # Icon already set
-        model_key = (host.get('model') or "").lower().replace(" ", "_")
-        vendor_key = (host.get('vendor') or "").lower()
-        icon_candidates = [
-            f"{model_key}.png" if model_key else None,
-            f"{vendor_key}.png" if vendor_key else None,
-            f"{vendor_key}_printer.png" if vendor_key else None,
-            "network-server.png"
-        ]
-        for icon_name in icon_candidates:
-            if icon_name and os.path.exists(os.path.join(ICON_PATH, icon_name)):
-                icon_path = os.path.join(ICON_PATH, icon_name)
-                break
-        else:
-            icon_path = os.path.join(ICON_PATH, "network-server.png")
-        host['icon_path'] = icon_path
+        assign_icon_to_host(host)
 
     def get_icon_path(self, host):
-        # Return Apple icon if vendor is Apple
-        if host.get("vendor", "").lower() == "apple":
-            return "icons/png/apple.png"
-        # fallback to default icon
-        return DEFAULT_ICON
+        return get_icon_path(host)
 
     def refresh_host_display(self):
         self.update_host_list()
@@ -484,15 +761,31 @@ class ScannerWindow(QMainWindow):
         self.hosts = []
         # Lock to prevent race conditions when modifying hosts list
         self._hosts_lock = threading.Lock()
-        # Temporary file for scan results
-        self._temp_file = tempfile.NamedTemporaryFile(delete=False, mode='w', encoding='utf-8')
-        # Start with an empty JSON array
-        self._temp_file.write('[]')
-        self._temp_file.flush()
-        # For asynchronous ping
+        # Immutable copy of self.hosts republished after each change;
+        # readers iterate it without taking the lock
+        self._hosts_snapshot = ()
+        # IP → host dict, kept in step with the hosts model
+        self._host_by_ip = {}
+        # Resolved icon path → QIcon, so each file is decoded once
+        self._qicon_cache = {}
+        # For asynchronous ping; output lines are buffered and logged
+        # together at most every 200 ms and when ping exits
         self.ping_proc = None
-        # Track OS detection threads by IP
+        self._ping_buf = []
+        self._ping_flush_timer = QTimer(self)
+        self._ping_flush_timer.setSingleShot(True)
+        self._ping_flush_timer.setInterval(200)
+        self._ping_flush_timer.timeout.connect(self._flush_ping_output)
+        # Track OS detection tasks by IP
         self._os_threads = {}
+        # Pool for CPU-bound work (the mDNS merge); OS detection and port
+        # scans await their processes on the shared scan loop instead
+        self._scan_pool = QThreadPool(self)
+        self._scan_pool.setMaxThreadCount(4)
+        # mDNS merge tasks still running on the pool
+        self._merge_tasks = set()
+        # mDNS results from earlier runs that are still within their TTL
+        self._mdns_cache = load_mdns_cache()
 
         mb = QMenuBar(self)
         self.setMenuBar(mb)
@@ -504,6 +797,17 @@ class ScannerWindow(QMainWindow):
         export_act.triggered.connect(self.export_scan_results)
         file_menu.addAction(export_act)
 
+        scan_menu = mb.addMenu("Scan")
+        os_all_act = QAction("Detect OS for All Hosts", self)
+        os_all_act.triggered.connect(self.start_os_detection_all)
+        scan_menu.addAction(os_all_act)
+        ports_all_act = QAction("Scan Ports for All Hosts", self)
+        ports_all_act.triggered.connect(self.start_host_port_scan_all)
+        scan_menu.addAction(ports_all_act)
+        rescan_act = QAction("Rescan Ports (Ignore Cache)", self)
+        rescan_act.triggered.connect(lambda: self.start_host_port_scan(force=True))
+        scan_menu.addAction(rescan_act)
+
         st = mb.addMenu("Settings")
         set_act = QAction("Settings...", self)
         set_act.triggered.connect(self.open_settings)
@@ -521,6 +825,14 @@ class ScannerWindow(QMainWindow):
         self.rs_path = self.settings.value('rustscan_path', default_rs)
         default_nmap = self.settings.value('nmap_path', shutil.which('nmap') or 'nmap')
         self.nmap_path = default_nmap
+        # Discovery timing: packet-rate floor and per-host time cap
+        self.min_rate = int(self.settings.value('min_rate', 2000))
+        self.host_timeout = self.settings.value('host_timeout', '30s')
+        # Skip ARP pings on L3-separated or client-isolated networks
+        self.skip_arp = self.settings.value('skip_arp', False, type=bool)
+        # Port/OS scans allowed to run at once; one slow host only holds one slot
+        self.max_concurrency = int(self.settings.value('max_concurrency', 8))
+        set_max_concurrency(self.max_concurrency)
 
         tb = QToolBar()
         tb.setMovable(False)
@@ -555,6 +867,17 @@ class ScannerWindow(QMainWindow):
         self.filter_edit.setPlaceholderText("Search hosts…")
         self.filter_edit.setFrame(True)
         self.filter_edit.textChanged.connect(self.apply_filter)
+        # Filtering runs once typing pauses, not on every keystroke
+        self._pending_filter = ''
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._do_apply_filter)
+        # Coalesces populate's status-bar/count updates during bursts
+        self._ui_flush_timer = QTimer(self)
+        self._ui_flush_timer.setSingleShot(True)
+        self._ui_flush_timer.setInterval(100)
+        self._ui_flush_timer.timeout.connect(self._flush_ui_state)
         # Combine subnet, Scan, Deep Scan, and Filter controls into one toolbar group
         combo_widget = QWidget()
         combo_layout = QHBoxLayout(combo_widget)
@@ -588,8 +911,8 @@ class ScannerWindow(QMainWindow):
         # Set icon and button sizes for a consistent globe appearance
         globe_btn.setIconSize(QSize(24, 24))       # adjust 24x24 as desired
         globe_btn.setFixedSize(32, 32)             # button area size (icon + padding)
-        # Add internal padding around the icon
-        globe_btn.setStyleSheet("padding:4px;")    # adjusts space around icon
+        # Internal padding around the icon comes from the window stylesheet
+        globe_btn.setObjectName("globeBtn")
         globe_btn.setToolTip("Open Bonjour service browser")
         globe_btn.setFlat(True)
         globe_btn.clicked.connect(self.open_bonjour_window)
@@ -598,23 +921,29 @@ class ScannerWindow(QMainWindow):
         # Add a bit of right padding
         tb.setContentsMargins(0, 0, 4, 0)   # increase right padding to 16px
 
-        self.tree = QTreeWidget()
+        # Hosts view reads straight from the model; no per-row items
+        self.hosts_model = HostsModel(self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.hosts_model)
         # Restore default larger host list icon size
         self.tree.setIconSize(QSize(48, 48))
-        self.tree.setColumnCount(1)
         # Hide the redundant tree header now that the tab provides the label
         self.tree.setHeaderHidden(True)
-        self.tree.currentItemChanged.connect(self.show_details)
+        self.tree.selectionModel().currentChanged.connect(self.show_details)
         self.tree.setMaximumWidth(380)
         self.tree.setColumnWidth(0, 180)
+        # Long names are elided by the view's own delegate; no per-row widgets
+        self.tree.setTextElideMode(Qt.TextElideMode.ElideRight)
 
         # --- Permanent log area (persistent, always at bottom of right pane)
         self.log_area = LogTextEdit()
         self.log_area.setReadOnly(True)
         self.log_area.setMinimumHeight(100)
         self.log_area.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self.log_area.setStyleSheet("QTextEdit { border: none; }")
+        self.log_area.setObjectName("logArea")
         self.log_area.setPlaceholderText("Log output will appear here...")
+        # Let Qt drop the oldest lines once the log grows past 500
+        self.log_area.document().setMaximumBlockCount(QTextEditLogger.MAX_PENDING)
 
         # ── Hook Python logging into the log_area ──
         log_handler = QTextEditLogger(self.log_area)
@@ -649,6 +978,7 @@ class ScannerWindow(QMainWindow):
         self.ports_list = QListWidget()
         self.ports_layout.addWidget(self.ports_list)
         self.tabs.addTab(self.ports_tab, "Ports")
+        self._build_details_pane()
 
         # Right pane: use a vertical splitter to allow resizing between details and log area
         self.detail_pane = QSplitter(Qt.Orientation.Vertical)
@@ -699,7 +1029,13 @@ class ScannerWindow(QMainWindow):
         self.setCentralWidget(container)
 
         self.host_port_threads = {}
+        # Ports reported so far by running scans, per IP
+        self._live_ports = {}
         self.scan_thread = None
+        # Neighbor-table read that precedes a quick scan's discovery
+        self._neigh_proc = None
+        # Bumped by every scan start/stop; late results from older scans are dropped
+        self._scan_generation = 0
         self.statusBar().showMessage("Ready to scan - click 'Scan' or 'Deep Scan' to begin")
 
         self.progress = QProgressBar(self)
@@ -725,13 +1061,8 @@ class ScannerWindow(QMainWindow):
         self.statusBar().setFont(notif_font)
         self.host_count_label.setFont(notif_font)
         self.spinner_label.setFont(notif_font)
-        self.statusBar().setStyleSheet("color: #999999;")  # muted gray text
-
-        self.host_count_label.setFont(notif_font)
-        self.host_count_label.setStyleSheet("color: #999999;")
-
-        self.spinner_label.setFont(notif_font)
-        self.spinner_label.setStyleSheet("color: #999999;")
+        # One stylesheet for the whole window instead of one per widget
+        self.setStyleSheet(_WINDOW_QSS)
 
         # Initialize system tray icon for notifications
         self.tray_icon = QSystemTrayIcon(self)
@@ -739,20 +1070,17 @@ class ScannerWindow(QMainWindow):
         self.tray_icon.setIcon(app_icon)
         self.tray_icon.show()
 
-        # Animation timer for indeterminate scan progress
-        self.progress_anim_timer = QTimer(self)
-        self._anim_step = 5
-        self._anim_max = 505  # number of steps for full sweep (~2s at 100ms)
-        self.progress_anim_timer.timeout.connect(self._update_progress_anim)
-        # Multi-phase progress setup: unified discovery + mDNS
-        self._total_phases = 2  # Unified phases: discovery + mDNS
-        self._segment_size = self._anim_max // self._total_phases
-        self._current_phase = 0
-    def _update_progress_anim(self):
-        # Unified multi-phase animation within current phase
-        self._anim_step = (self._anim_step + 1) % self._segment_size
-        base = (self._current_phase - 1) * self._segment_size
-        self.progress.setValue(base + self._anim_step)
+
+    def _progress_busy(self):
+        """Show the progress bar as Qt's native indeterminate (busy) indicator."""
+        self.progress.setRange(0, 0)
+        self.progress.show()
+
+    def _progress_done(self):
+        """Fill the progress bar, then hide it shortly after."""
+        self.progress.setRange(0, 1)
+        self.progress.setValue(1)
+        QTimer.singleShot(1000, self.progress.hide)
 
     def open_bonjour_window(self):
         """
@@ -773,11 +1101,8 @@ class ScannerWindow(QMainWindow):
 
     def reenable_scan_buttons(self):
         """Re-enable both scan controls."""
-        # Ensure animation finishes at 100% when scan completes
-        self.progress_anim_timer.stop()
-        self.progress.setValue(self._anim_max)
-        # Hide progress bar after reaching 100%
-        QTimer.singleShot(1000, self.progress.hide)
+        # Finish at 100% when scan completes, then hide
+        self._progress_done()
         self.scan_btn.setEnabled(True)
         self.advanced_scan_btn.setEnabled(True)
         self.advanced_mode = False
@@ -793,18 +1118,12 @@ class ScannerWindow(QMainWindow):
         """
         Start a quick scan of the specified subnet.
         """
-        # Reset unified phase tracking
-        self._current_phase = 1
+        self._scan_generation += 1
         # Change scan button to "Stop" and connect to stop_scan
         self.scan_btn.setText("Stop")
         self.scan_btn.clicked.disconnect()
         self.scan_btn.clicked.connect(self.stop_scan)
         self.advanced_scan_btn.setEnabled(False)
-        # Reset temporary results file
-        self._temp_file.seek(0)
-        self._temp_file.truncate()
-        self._temp_file.write('[]')
-        self._temp_file.flush()
         # Clear the log area at the start of a new scan
         self.log_area.clear()
         subnet = self.subnet_edit.text().strip()
@@ -815,7 +1134,12 @@ class ScannerWindow(QMainWindow):
             self.scan_btn.clicked.connect(self.start_scan)
             self.advanced_scan_btn.setEnabled(True)
             return
-        if not self.is_valid_subnet(subnet):
+        try:
+            if not self.is_valid_subnet(subnet):
+                raise ValueError(subnet)
+            # Parsed once here and handed to the neighbor-table parser
+            net = ipaddress.ip_network(subnet, strict=False)
+        except ValueError:
             QMessageBox.warning(self, "Invalid subnet", "Please enter a valid CIDR subnet like 192.168.1.0/24.")
             self.scan_btn.setText("Scan")
             self.scan_btn.clicked.disconnect()
@@ -824,40 +1148,86 @@ class ScannerWindow(QMainWindow):
             return
 
         # Clear previous data
-        self.tree.clear()
-        self.hosts.clear()
+        self._clear_tree()
+        with self._hosts_lock:
+            self.hosts.clear()
+            self._publish_hosts()
         self.host_count_label.setText("Hosts: 0")
         self.clear_details()
         self.statusBar().showMessage(f"Scanning {subnet}...")
 
+        # Show busy progress bar and spinner from the start; discovery
+        # begins once the neighbor table has been read
+        self._progress_busy()
+        self.spinner_label.show()
+        self.spinner_timer.start(100)
+        self.read_neighbor_table(net, lambda arp_hosts: self._launch_scan(subnet, arp_hosts))
+
+    def _launch_scan(self, subnet, arp_hosts):
+        """Show neighbor-table hosts, then start nmap discovery of subnet."""
+        # Hosts already in the ARP/neighbor cache show up immediately and
+        # are not waited on again by the nmap discovery pass
+        if arp_hosts:
+            self.populate({'hosts': arp_hosts})
+            self.log_area.append(f"{len(arp_hosts)} host(s) found in neighbor table")
+
         # Launch thread
-        self.scan_thread = ScanThread(subnet, self.rs_path, self.nmap_path)
+        self.scan_thread = ScanThread(subnet, self.rs_path, self.nmap_path,
+                                      scan_flags=self._discovery_flags(ScanThread.DEFAULT_PROBES),
+                                      known_hosts=arp_hosts)
         self.scan_thread.result.connect(self.populate)
         self.scan_thread.error.connect(self.on_error)
         self.scan_thread.discovery_finished.connect(self._on_discovery_finished)
         self.scan_thread.discovery_update.connect(self._on_discovery_update)
-        # Show progress bar during scan
-        self.progress.show()
-        # Animate progress bar over _anim_max steps
-        self.progress.setRange(0, self._anim_max)
-        self._anim_step = 0
-        self.progress.setValue(0)
-        self.progress_anim_timer.start(100)
-        # Show spinner during initial host discovery
-        self.spinner_label.show()
-        self.spinner_timer.start(100)
         # self.scan_thread.finished.connect(self._on_scan_finished)
 
         self.scan_thread.start()
         # --- mDNS resolution now started after discovery is finished ---
 
+    def read_neighbor_table(self, network, done):
+        """
+        Read the OS neighbor/ARP cache in a QProcess and call done() with
+        the host entries inside network (empty on failure or after 2 s).
+        """
+        prog, args = neighbor_table_command()
+        proc = QProcess(self)
+        self._neigh_proc = proc
+        timer = QTimer(proc)
+        timer.setSingleShot(True)
+        timer.timeout.connect(proc.kill)
+
+        def finish(hosts):
+            timer.stop()
+            proc.deleteLater()
+            # stop_scan dropped this read; do not start discovery
+            if self._neigh_proc is not proc:
+                return
+            self._neigh_proc = None
+            done(hosts)
+
+        def on_finished(code, status):
+            if status != QProcess.ExitStatus.NormalExit:
+                finish([])
+                return
+            out = bytes(proc.readAllStandardOutput()).decode('utf-8', errors='replace')
+            finish(parse_neighbor_table(out, network))
+
+        def on_error(error):
+            # No finished signal follows a failed start
+            if error == QProcess.ProcessError.FailedToStart:
+                finish([])
+
+        proc.finished.connect(on_finished)
+        proc.errorOccurred.connect(on_error)
+        timer.start(2000)
+        proc.start(prog, args)
+
     def start_advanced_scan(self):
         """
         Perform a thorough, multipass host discovery and extended mDNS aggregation.
         """
+        self._scan_generation += 1
         subnet = self.subnet_edit.text().strip()
-        # Reset unified phase tracking
-        self._current_phase = 1
         # Change advanced scan button to "Stop" and connect to stop_scan
         self.advanced_scan_btn.setText("Stop")
         self.advanced_scan_btn.clicked.disconnect()
@@ -877,31 +1247,32 @@ class ScannerWindow(QMainWindow):
             self.advanced_scan_btn.clicked.connect(self.start_advanced_scan)
             self.scan_btn.setEnabled(True)
             return
-        # Reset phase counter for a fresh multi-pass scan
-        # self._current_phase = 0
         self.advanced_mode = True
         # Clear previous results
-        self.tree.clear()
-        self.hosts.clear()
+        self._clear_tree()
+        with self._hosts_lock:
+            self.hosts.clear()
+            self._publish_hosts()
         self.host_count_label.setText("Hosts: 0")
         # Clear the GUI log area for a fresh scan
         self.log_area.clear()
         # Show spinner during deep scan discovery phases
         self.spinner_label.show()
         self.spinner_timer.start(100)
-        # Start deep scan passes (no progress_anim_timer here)
+        # Start deep scan passes
         self._execute_scan_passes(0)
 
     def stop_scan(self):
+        self._scan_generation += 1
+        if self._neigh_proc is not None:
+            proc, self._neigh_proc = self._neigh_proc, None
+            proc.kill()
         if self.scan_thread and self.scan_thread.isRunning():
-            self.scan_thread.requestInterruption()
-            self.scan_thread.terminate()
-            self.scan_thread.wait()
+            self.scan_thread.stop()
         if hasattr(self, 'mdns_worker') and self.mdns_worker.isRunning():
             self.mdns_worker.requestInterruption()
             self.mdns_worker.terminate()
             self.mdns_worker.wait()
-        self.progress_anim_timer.stop()
         self.progress.hide()
         self.spinner_timer.stop()
         self.spinner_label.hide()
@@ -918,25 +1289,14 @@ class ScannerWindow(QMainWindow):
 
     def _execute_scan_passes(self, index=0):
         """
-        Sequentially run scanning passes: ARP, ICMP, and TCP/UDP probes.
+        Run the deep-scan discovery passes in order (see _SCAN_PASSES).
         """
-        # Phase start: increment and configure progress slice
-        self._current_phase += 1
-        start_val = (self._current_phase - 1) * self._segment_size
-        end_val = self._current_phase * self._segment_size
-        self.progress.setRange(start_val, end_val)
-        self._anim_step = 0
-        self.progress.setValue(start_val)
-        self.progress.show()
-        self.progress_anim_timer.start(100)
+        # Phase start: busy progress until the pass reports back
+        self._progress_busy()
         # Ensure spinner is visible for each scan pass
         self.spinner_label.show()
         self.spinner_timer.start(100)
-        passes = [
-            (['-PR'], 'ARP pass'),
-            (['-PE'], 'ICMP pass'),
-            (['-PS80,443', '-PU53'], 'TCP/UDP pass'),
-        ]
+        passes = self._SCAN_PASSES
         if index < len(passes):
             flags, label = passes[index]
             # Update status
@@ -946,7 +1306,7 @@ class ScannerWindow(QMainWindow):
                 self.subnet_edit.text().strip(),
                 self.rs_path,
                 self.nmap_path,
-                scan_flags=flags
+                scan_flags=self._discovery_flags(flags)
             )
             self.scan_thread.result.connect(self.populate)
             self.scan_thread.error.connect(self.on_error)
@@ -961,14 +1321,8 @@ class ScannerWindow(QMainWindow):
             QTimer.singleShot(1000, self._start_mdns)
 
     def _on_scan_pass_finished(self, index):
+        self._flush_pending_ui()
         # Merge UI and host count, then next pass
-        self.progress.hide()
-        # Update progress bar for completed pass
-        total_passes = 3
-        self.progress.setValue(index + 1)
-        if index + 1 >= total_passes:
-            # All passes done: hide progress bar after mDNS begins
-            QTimer.singleShot(500, self.progress.hide)
         self.host_count_label.setText(f"Hosts: {len(self.hosts)}")
         # Small pause before next pass
         QTimer.singleShot(200, lambda: self._execute_scan_passes(index + 1))
@@ -982,34 +1336,23 @@ class ScannerWindow(QMainWindow):
             self.spinner_timer.stop()
             self.spinner_label.hide()
         self.statusBar().showMessage("Resolving Bonjour/mDNS services…")
-        # Final phase (mDNS): configure progress slice
-        self._current_phase += 1
-        start_val = (self._current_phase - 1) * self._segment_size
-        end_val = self._current_phase * self._segment_size
-        self.progress.setRange(start_val, end_val)
-        self.progress.show()
+        # Final phase (mDNS): busy until results are merged
+        self._progress_busy()
         timeout = 2.0 if self.advanced_mode else 1.0
         # Launch mDNS resolution in a QThread for thread-safe UI updates
-        self.mdns_worker = MDNSWorker(timeout=timeout)
+        self.mdns_worker = MDNSWorker(timeout=timeout, cache=self._mdns_cache)
         # Only connect mdns_done to _on_mdns_done; do not re-enable scan controls here
         self.mdns_worker.mdns_done.connect(self._on_mdns_done)
         self.mdns_worker.host_found.connect(self._on_mdns_partial)
         self.mdns_worker.start()
 
-    # elsewhere in the code, when connecting HostPortThread.result:
-    # t.result.connect(lambda data, ip=clean_ip: self.on_host_ports_multi(ip, data))
-    # should be replaced by:
-    # t.result.connect(lambda ip, ports: self.on_host_ports_multi(ip, ports))
         
         
     def _on_discovery_finished(self):
-        # Phase 2 (mDNS) unified progress
-        self._current_phase = 2
-        start_val = (self._current_phase - 1) * self._segment_size
-        end_val   = self._current_phase * self._segment_size
-        self.progress.setRange(start_val, end_val)
-        self.progress.show()
-        self.mdns_worker = MDNSWorker(timeout=2.0)
+        self._flush_pending_ui()
+        # Phase 2 (mDNS): busy until results are merged
+        self._progress_busy()
+        self.mdns_worker = MDNSWorker(timeout=2.0, cache=self._mdns_cache)
         # Only connect mdns_done to _on_mdns_done; do not re-enable scan controls here
         self.mdns_worker.mdns_done.connect(self._on_mdns_done)
         self.mdns_worker.host_found.connect(self._on_mdns_partial)
@@ -1018,90 +1361,63 @@ class ScannerWindow(QMainWindow):
         
 
     def _on_mdns_done(self, results):
-        self.progress_anim_timer.stop()
         # Stop and hide spinner when mDNS completes
         self.spinner_timer.stop()
         self.spinner_label.hide()
         log.info(f"mDNS complete with results: {results}")
-        import copy
-        updated = 0
+        self._update_mdns_cache(results)
+        # Merge on a pool thread over copies of the host records; the
+        # window only applies the result and refreshes the tree
         with self._hosts_lock:
-            for host in self.hosts:
-                ip = host.get('ip')
-                mdns = results.get(ip)
-                if mdns:
-                    host['mdns_name'] = mdns.get('hostname', '')
-                    host['mdns_services'] = mdns.get('services', [])
-                    if 'mdns_props' in mdns:
-                        host['mdns_props'] = copy.deepcopy(mdns['mdns_props'])
-                        # Merge mDNS model into host['model']
-                        md_val = (
-                            host['mdns_props'].get('model')
-                            or host['mdns_props'].get('md')
-                            or host['mdns_props'].get('am')     # Apple Bonjour key
-                            or host['mdns_props'].get('ty')     # e.g. 'XEROX WorkCentre 3335'
-                            or host['mdns_props'].get('product')  # optional fallback
-                            or ''
-                        )
-                        vendor_prefix = host.get('vendor', '').upper() + ' '
-                        if md_val.upper().startswith(vendor_prefix):
-                            md_val = md_val[len(vendor_prefix):]
-                        if md_val and md_val not in {'0', '0,1,2'}:
-                            host['model'] = md_val
-                else:
-                    host['mdns_name'] = ''
-                    host['mdns_services'] = []
-                    host['mdns_props'] = {}
-                self.assign_icon_to_host(host)
-                # --- Begin ICON SUGGESTED LOGGING BLOCK ---
-                # Log which icon the system intended to use (even if default)
-                icon_name_suggested = "unknown"
-                # Improved normalization: strip, lowercase, replace commas and spaces with underscores
-                model = (host.get("model") or "").strip().lower().replace(",", "_").replace(" ", "_")
-                vendor = (host.get("vendor") or "").strip().lower().replace(",", "_").replace(" ", "_")
-                used_icon = None
-                if model and os.path.exists(os.path.join("icons", "png", f"{model}.png")):
-                    icon_name_suggested = f"{model}.png"
-                    used_icon = os.path.join("icons", "png", f"{model}.png")
-                elif vendor and os.path.exists(os.path.join("icons", "png", f"{vendor}.png")):
-                    icon_name_suggested = f"{vendor}.png"
-                    used_icon = os.path.join("icons", "png", f"{vendor}.png")
-                elif vendor and os.path.exists(os.path.join("icons", "png", f"{vendor}_printer.png")):
-                    icon_name_suggested = f"{vendor}_printer.png"
-                    used_icon = os.path.join("icons", "png", f"{vendor}_printer.png")
-                else:
-                    icon_name_suggested = "network-server.png"
-                #log.debug(f"[ICON] Host {host.get('ip')} would have used: icons/png/{icon_name_suggested}")
-                # --- End ICON SUGGESTED LOGGING BLOCK ---
-                host["icon_path"] = host.get("icon_path", self.get_icon_path(host))
-                # Retry fallback icon assignment if icon_path used network-server.png but we now have a valid icon
-                if host.get("icon_path", "").endswith("network-server.png") and used_icon and os.path.exists(used_icon):
-                    host["icon_path"] = used_icon
-                    log.debug(f"[ICON] Reassigned valid icon after fallback: {used_icon}")
-                # Immediately refresh the icon in the UI after icon_path is set
-                self.set_icon_for_host(ip)
-                # Update icon if icon_path changed and item exists
-                for i in range(self.tree.topLevelItemCount()):
-                    item = self.tree.topLevelItem(i)
-                    ip_item = item.data(0, Qt.ItemDataRole.UserRole)
-                    if ip_item == host['ip']:
-                        new_icon_path = host['icon_path']
-                        if new_icon_path and os.path.exists(new_icon_path):
-                            item.setIcon(0, QIcon(new_icon_path))
-                        break
-                updated += 1
-        self.tree.clear()
+            hosts = [dict(h) for h in self.hosts]
+        task = MDNSMergeTask(hosts, results, merge_mdns_results, self._scan_generation)
+        task.result.connect(lambda merged: self._apply_mdns_merge(merged, task.generation))
+        task.error.connect(self.on_error)
+        task.finished.connect(lambda: self._merge_tasks.discard(task))
+        # Keep the task referenced until it is done
+        self._merge_tasks.add(task)
+        self._scan_pool.start(task)
+
+    def _update_mdns_cache(self, results):
+        """Stamp fresh results, drop expired entries and save the cache."""
+        now = time.time()
+        for ip, entry in results.items():
+            # Entries carried over from the cache already have a stamp; keep it
+            if 'ts' not in entry:
+                self._mdns_cache[ip] = dict(entry, ts=now, ttl=MDNS_RECORD_TTL)
+        self._mdns_cache = {
+            ip: e for ip, e in self._mdns_cache.items()
+            if now - e.get('ts', 0) < e.get('ttl', MDNS_RECORD_TTL)
+        }
+        save_mdns_cache(self._mdns_cache)
+
+    def _apply_mdns_merge(self, merged, generation):
+        # A merge that outlived its scan (stopped or replaced) must not touch
+        # the current scan's rows or buttons
+        if generation != self._scan_generation:
+            log.debug("Dropping mDNS merge from a previous scan")
+            return
+        # Copy back only the fields the merge owns, so port/OS results that
+        # landed while it ran are kept
         with self._hosts_lock:
-            for h in self.hosts:
-                self._add_host_item(h)
-        current = self.tree.currentItem()
-        if current:
+            for m in merged:
+                host = self._host_by_ip.get(m.get('ip'))
+                if host is not None:
+                    host.update((k, m[k]) for k in _MDNS_MERGE_KEYS if k in m)
+            self._publish_hosts()
+        # Refresh the existing rows in place with one dataChanged; only hosts
+        # without a row yet are appended
+        changed, added = [], []
+        for h in self._hosts_snapshot:
+            (changed if self.hosts_model.has_ip(h['ip']) else added).append(h)
+        self.hosts_model.update_rows([(h, *self._host_display(h)) for h in changed])
+        self._add_host_rows(added)
+        current = self.tree.currentIndex()
+        if current.isValid():
             self.show_details(current, None)
         self.statusBar().showMessage(f"Scan complete — {len(self.hosts)} hosts, mDNS merged")
         # Finalize progress on mDNS completion
-        self.progress_anim_timer.stop()
-        self.progress.setValue(self._anim_max)
-        QTimer.singleShot(1000, self.progress.hide)
+        self._progress_done()
         # Re-enable scan controls after mDNS merge truly finishes
         self.scan_btn.setEnabled(True)
         self.advanced_scan_btn.setEnabled(True)
@@ -1120,13 +1436,14 @@ class ScannerWindow(QMainWindow):
         """
         with self._hosts_lock:
             # Find the matching host entry
-            host = next((h for h in self.hosts if h.get('ip') == ip), None)
+            host = self._host_by_ip.get(ip)
             if not host:
                 return
             # Merge properties
             host['mdns_name'] = mdns.get('hostname', '')
             host['mdns_services'] = mdns.get('services', [])
             host['mdns_props'] = mdns.get('mdns_props', {})
+            _normalize_host_keys(host)
             # Reassign icon
             self.assign_icon_to_host(host)
             # Refresh the icon in the UI
@@ -1136,17 +1453,12 @@ class ScannerWindow(QMainWindow):
         """
         Refresh the icon for the host with the given IP in the UI, based on host['icon_path'].
         """
-        host_data = next((h for h in self.hosts if h.get('ip') == ip), None)
+        host_data = self._host_by_ip.get(ip)
         if not host_data:
             return
         new_icon_path = host_data.get('icon_path', '')
-        for i in range(self.tree.topLevelItemCount()):
-            item = self.tree.topLevelItem(i)
-            ip_item = item.data(0, Qt.ItemDataRole.UserRole)
-            if ip_item == ip:
-                if new_icon_path and os.path.exists(new_icon_path):
-                    item.setIcon(0, QIcon(new_icon_path))
-                break
+        if new_icon_path and os.path.exists(new_icon_path):
+            self.hosts_model.set_icon(ip, self._get_qicon(new_icon_path))
 
 
     def _update_spinner(self):
@@ -1158,6 +1470,12 @@ class ScannerWindow(QMainWindow):
         # Show ongoing discovery details in status bar
         self.statusBar().showMessage(msg)
 
+    def _discovery_flags(self, probes):
+        """Probe flags plus the timing/ARP options chosen in Settings."""
+        if self.skip_arp:
+            probes = [f for f in probes if f != '-PR'] + ['--disable-arp-ping']
+        return probes + ['--min-rate', str(self.min_rate), '--host-timeout', self.host_timeout]
+
     def open_settings(self):
         dlg = QDialog(self)
         dlg.setWindowTitle("Settings")
@@ -1169,6 +1487,24 @@ class ScannerWindow(QMainWindow):
         nmap_edit = QLineEdit(self.nmap_path, dlg)
         form.addRow("Nmap path:", nmap_edit)
 
+        rate_edit = QLineEdit(str(self.min_rate), dlg)
+        rate_edit.setToolTip("nmap --min-rate: packets per second to send at least")
+        form.addRow("Min packet rate:", rate_edit)
+
+        timeout_edit = QLineEdit(self.host_timeout, dlg)
+        timeout_edit.setToolTip("nmap --host-timeout, e.g. 30s or 2m")
+        form.addRow("Host timeout:", timeout_edit)
+
+        skip_arp_check = QCheckBox("Skip ARP ping (slow/remote networks)", dlg)
+        skip_arp_check.setChecked(self.skip_arp)
+        form.addRow(skip_arp_check)
+
+        concurrency_spin = QSpinBox(dlg)
+        concurrency_spin.setRange(1, 64)
+        concurrency_spin.setValue(self.max_concurrency)
+        concurrency_spin.setToolTip("Port and OS scans run at once; others wait for a free slot")
+        form.addRow("Max concurrent scans:", concurrency_spin)
+
         buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
             dlg
@@ -1188,13 +1524,31 @@ class ScannerWindow(QMainWindow):
             if new_nmap:
                 self.nmap_path = new_nmap
                 self.settings.setValue('nmap_path', self.nmap_path)
-
-    def _add_host_item(self, host):
+            # Save discovery timing
+            new_rate = rate_edit.text().strip()
+            if new_rate.isdigit() and int(new_rate) > 0:
+                self.min_rate = int(new_rate)
+                self.settings.setValue('min_rate', self.min_rate)
+            new_timeout = timeout_edit.text().strip()
+            if re.fullmatch(r'\d+(ms|s|m|h)?', new_timeout):
+                self.host_timeout = new_timeout
+                self.settings.setValue('host_timeout', self.host_timeout)
+            self.skip_arp = skip_arp_check.isChecked()
+            self.settings.setValue('skip_arp', self.skip_arp)
+            self.max_concurrency = concurrency_spin.value()
+            self.settings.setValue('max_concurrency', self.max_concurrency)
+            set_max_concurrency(self.max_concurrency)
+
+    def _add_host_rows(self, hosts):
+        """Index hosts by IP and append them to the hosts model in one insert."""
+        for host in hosts:
+            self._host_by_ip[host['ip']] = host
+        self.hosts_model.append_rows([(h, *self._host_display(h)) for h in hosts])
+
+    def _host_display(self, host):
+        """Return the (label, icon) shown for host in the Hosts view."""
         # Remove any empty-string model keys from mdns_props
         _remove_empty_mdns_model_keys(host)
-        # Compute absolute icons directory
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        icons_dir = os.path.join(script_dir, 'icons')
         ip = host['ip']
         rdns = host.get('hostname', '').strip()
         mdns = host.get('mdns_name', '').strip()
@@ -1215,228 +1569,103 @@ class ScannerWindow(QMainWindow):
         if line3:
             label_text += f"\n{line3}"
 
-        item = QTreeWidgetItem(self.tree)
+        if '_mac_prefix' not in host:
+            _normalize_host_keys(host)
+        icon_name = _select_icon_name(
+            host['_mac_prefix'], host['_model_key'], host['_vendor_key'], rdns, mdns
+        )
+        # Apply explicit icon filename mapping if present
+        icon_path = _resolve_icon(icon_map.get(icon_name, icon_name))
         # Use server.svg as default
-        default_icon = QIcon(os.path.join(icons_dir, 'server.svg'))
-        mdns_props = host.get('mdns_props', {})
-        # Use host['model'] (cleaned of vendor prefix) before falling back to raw mDNS props
-        model = host.get('model') or mdns_props.get('model') or mdns_props.get('md', '')
-        vendor = host.get('vendor', '') or mdns_props.get('vn', '')
-        mac = host.get('mac', '')
-
-        # --- Begin new prioritized icon selection logic ---
-        # Lookup order:
-        # 0. OUI/mac-prefix specific icon (highest priority)
-        # 1. model-based (e.g. appletv14,1.svg)
-        # 2. mdns_models and apple_models dicts
-        # 4. vendor name image (e.g. eero.png)
-        # 5. hostname/localhostname
-        # 6. default icon (network-server.svg)
-        apple_models = apple_model_map
-        vendor_icons = {k.lower(): k.lower() for k in set(icon_map.keys())}
-        mdns_models = mdns_model_map
-
-        icon_name = None
-
-        # Normalize inputs
-        mac_prefix = mac.upper().replace(":", "")[:6] if mac else ""
-        vendor_key = vendor.strip() if vendor else ""
-        model_key = model.strip() if model else ""
-
-        # 0. OUI/mac-prefix specific icon (highest priority)
-        if mac_prefix:
-            mac_png = os.path.join(icons_dir, "png", f"{mac_prefix.lower()}.png")
-            if os.path.exists(mac_png):
-                icon_name = mac_prefix.lower()
-
-        # 1. Model-based (direct filename match, e.g. appletv14,1.svg)
-        if not icon_name and model_key:
-            # Direct filename match (case-insensitive)
-            model_filename = model_key.lower().replace(',', '_').replace(' ', '_')
-            # Check for svg/png in icons/svg or icons/png
-            svg_path = os.path.join(icons_dir, "svg", f"{model_filename}.svg")
-            png_path = os.path.join(icons_dir, "png", f"{model_filename}.png")
-            if os.path.exists(svg_path) or os.path.exists(png_path):
-                icon_name = model_filename
-
-        # 2. mdns_models dict (underscore-normalized), then case-insensitive, then apple_models
-        if not icon_name:
-            # normalize spaces to underscores for lookup
-            norm_key = model_key.lower().replace(" ", "_")
-            if norm_key in mdns_models:
-                icon_name = mdns_models[norm_key]
-            else:
-                # fallback to case-insensitive match of original model
-                for mk, val in mdns_models.items():
-                    if mk.lower() == model_key.lower():
-                        icon_name = val
-                        break
-        if not icon_name and mac_prefix in apple_models:
-            icon_name = apple_models[mac_prefix]
-
-        # 4. Vendor name image (e.g. eero, raspberry_pi, raspberry_pi_foundation)
-        if not icon_name and vendor_key:
-            # Sanitize to a base filename
-            vendor_filename = vendor_key.lower().replace(' ', '_')
-            vendor_filename = re.sub(r'[^a-z0-9_]', '_', vendor_filename)
-            vendor_filename = re.sub(r'_+', '_', vendor_filename).strip('_')
-
-            # Try PNG then SVG
-            png_path = os.path.join(icons_dir, "png", f"{vendor_filename}.png")
-            svg_path = os.path.join(icons_dir, "svg", f"{vendor_filename}.svg")
-            if os.path.exists(png_path) or os.path.exists(svg_path):
-                icon_name = vendor_filename
-            else:
-                # Strip common suffixes and retry
-                for suffix in ('_foundation', '_trading', '_inc', '_llc'):
-                    if vendor_filename.endswith(suffix):
-                        alt = vendor_filename[: -len(suffix)]
-                        alt_png = os.path.join(icons_dir, "png", f"{alt}.png")
-                        alt_svg = os.path.join(icons_dir, "svg", f"{alt}.svg")
-                        if os.path.exists(alt_png) or os.path.exists(alt_svg):
-                            icon_name = alt
-                            break
-
-        # 5. Hostname/localhostname fallback (e.g. eero-pro-6e-0naw.png)
-        if not icon_name:
-            # Try sanitized hostname and mdns_name
-            hostnames_to_try = []
-            if rdns:
-                hostnames_to_try.append(rdns)
-            if mdns and mdns not in hostnames_to_try:
-                hostnames_to_try.append(mdns)
-            for hn in hostnames_to_try:
-                # Sanitize: lowercase, replace spaces with underscores, strip domain parts
-                base = hn.split('.')[0]
-                sanitized = base.lower().replace(' ', '_')
-                sanitized = re.sub(r'[^a-z0-9_-]', '_', sanitized)
-                sanitized = re.sub(r'_+', '_', sanitized).strip('_')
-                hostname_png = os.path.join(icons_dir, "png", f"{sanitized}.png")
-                if os.path.exists(hostname_png):
-                    icon_name = sanitized
-                    break
-
-        # 6. Default fallback
-        if not icon_name:
-            icon_name = "network-server"
-        # --- End new prioritized icon selection logic ---
+        icon = self._get_qicon(icon_path or os.path.join(ICONS_DIR, 'server.svg'))
+        return label_text, icon
 
-        # Apply explicit icon filename mapping if present
-        mapped_name = icon_map.get(icon_name, icon_name)
-        # --- SVG/PNG fallback logic with normalized vendor string ---
-        icon_path = os.path.join(icons_dir, "svg", f"{mapped_name}.svg")
-        if not os.path.exists(icon_path):
-            icon_path = os.path.join(icons_dir, "png", f"{mapped_name}.png")
-        if os.path.exists(icon_path):
-            icon = QIcon(icon_path)
-        else:
-            # Fallback to other possible locations/extensions as before
-            svg_root = os.path.join(icons_dir, 'svg', f"{mapped_name}.svg")
-            svg_sub  = os.path.join(icons_dir, 'svg', f"{mapped_name}.svg")
-            png_root = os.path.join(icons_dir, 'png', f"{mapped_name}.png")
-            png_sub  = os.path.join(icons_dir, 'png', f"{mapped_name}.png")
-            jpeg_root = os.path.join(icons_dir, f"{mapped_name}.jpeg")
-            jpg_root  = os.path.join(icons_dir, f"{mapped_name}.jpg")
-            jpeg_sub  = os.path.join(icons_dir, 'png', f"{mapped_name}.jpeg")
-            jpg_sub   = os.path.join(icons_dir, 'png', f"{mapped_name}.jpg")
-            if os.path.exists(svg_root):
-                icon = QIcon(svg_root)
-            elif os.path.exists(svg_sub):
-                icon = QIcon(svg_sub)
-            elif os.path.exists(png_root):
-                icon = QIcon(png_root)
-            elif os.path.exists(png_sub):
-                icon = QIcon(png_sub)
-            elif os.path.exists(jpeg_root):
-                icon = QIcon(jpeg_root)
-            elif os.path.exists(jpg_root):
-                icon = QIcon(jpg_root)
-            elif os.path.exists(jpeg_sub):
-                icon = QIcon(jpeg_sub)
-            elif os.path.exists(jpg_sub):
-                icon = QIcon(jpg_sub)
-            else:
-                icon = default_icon
-        item.setIcon(0, icon)
-        # Force a redraw of the icon in the tree view
-        self.tree.viewport().update()
-        item.setText(0, label_text)
-        item.setData(0, Qt.ItemDataRole.UserRole, ip)
+    def _get_qicon(self, path):
+        """Return the shared QIcon for path, creating it on first use."""
+        icon = self._qicon_cache.get(path)
+        if icon is None:
+            icon = self._qicon_cache[path] = QIcon(path)
+        return icon
+
+    def _clear_tree(self):
+        """Empty the hosts model along with the IP index that mirrors it."""
+        self.hosts_model.clear()
+        self._host_by_ip.clear()
+
+    def _publish_hosts(self):
+        """Republish the read-only hosts snapshot; call with _hosts_lock held."""
+        self._hosts_snapshot = tuple(self.hosts)
 
     def populate(self, data):
+        # Each batch carries only hosts that are new or changed since the last
         new_hosts = data.get('hosts', [])
-        # If first batch, clear and add all
-        if not self.hosts:
-            self.tree.clear()
-            self.hosts = []
-            for host in new_hosts:
-                self.hosts.append(host)
-                self._add_host_item(host)
-        else:
-            # Append any additional hosts
-            for host in new_hosts[len(self.hosts):]:
-                self.hosts.append(host)
-                self._add_host_item(host)
-        # Save current hosts list to temp file
-        self._temp_file.seek(0)
-        json.dump(self.hosts, self._temp_file)
-        self._temp_file.truncate()
-        self._temp_file.flush()
+        added, updated = [], []
+        with self._hosts_lock:
+            # If first batch, start from an empty tree
+            if not self.hosts:
+                self._clear_tree()
+                self.hosts = []
+            for incoming in new_hosts:
+                host = self._host_by_ip.get(incoming['ip'])
+                if host is None:
+                    added.append(incoming)
+                    continue
+                # Keep port/OS/mDNS results; take only non-empty discovery fields
+                host.update((k, incoming[k]) for k in _DISCOVERY_KEYS if incoming.get(k))
+                updated.append(host)
+            for host in added + updated:
+                _normalize_host_keys(host)
+            self.hosts.extend(added)
+            self._publish_hosts()
+        # One model insert for the whole batch rather than one per host
+        self._add_host_rows(added)
+        if updated:
+            self.hosts_model.update_rows([(h, *self._host_display(h)) for h in updated])
         # Select first item on first populate
-        if self.tree.topLevelItemCount() and self.tree.currentItem() is None:
-            self.tree.setCurrentItem(self.tree.topLevelItem(0))
-        self.statusBar().showMessage(f"Found {len(self.hosts)} hosts")
-        # Update progress bar with number of hosts discovered
-        self.progress.setValue(len(self.hosts))
+        if self.hosts_model.rowCount() and not self.tree.currentIndex().isValid():
+            self.tree.setCurrentIndex(self.hosts_model.index(0))
+        # Status bar, progress and host count refresh at most every 100 ms
+        if not self._ui_flush_timer.isActive():
+            self._ui_flush_timer.start()
+
+    def _flush_pending_ui(self):
+        """Apply a throttled update now, before a phase change sets its own status."""
+        if self._ui_flush_timer.isActive():
+            self._ui_flush_timer.stop()
+            self._flush_ui_state()
+
+    def _flush_ui_state(self):
+        count = len(self._hosts_snapshot)
+        self.statusBar().showMessage(f"Found {count} hosts")
         # ←——- update the Hosts: # label
-        self.host_count_label.setText(f"Hosts: {len(self.hosts)}")
+        self.host_count_label.setText(f"Hosts: {count}")
 
     def apply_filter(self, text):
-        t = text.lower()
-        for i in range(self.tree.topLevelItemCount()):
-            item = self.tree.topLevelItem(i)
-            name = item.text(0).lower()
-            # ip = item.text(1)
-            item.setHidden(t not in name)
-
-    def show_details(self, current, _):
-        if not current:
-            return
-        ip = current.data(0, Qt.ItemDataRole.UserRole)
-        host = next((h for h in self.hosts if h['ip'] == ip), {})
-        # [DETAIL] Print showing details for host and its ports at INFO level
-        log.info(f"[DETAIL] Showing details for host: {host}")
-        ip = host.get('ip', '—')
-        hostname = host.get('hostname', '—')
-        mac = host.get('mac', '—')
-        vendor = host.get('vendor', '—')
-
-        # Preserve last scan mode selection
-        if hasattr(self, 'quick_rb'):
-            # Safely check the radio buttons in case they've been deleted
-            try:
-                custom_checked = self.custom_rb.isChecked()
-            except RuntimeError:
-                custom_checked = False
-            try:
-                advanced_checked = self.advanced_rb.isChecked()
-            except RuntimeError:
-                advanced_checked = False
-            if custom_checked:
-                self.last_scan_mode = 'custom'
-            elif advanced_checked:
-                self.last_scan_mode = 'advanced'
-            else:
-                self.last_scan_mode = 'quick'
-
-        self.clear_details()
-
-        # 2. Host Details group, now use QFrame to remove header space
-        # Use a frameless panel instead of a group box to remove header space
+        self._pending_filter = text
+        self._filter_timer.start()
+
+    def _do_apply_filter(self):
+        # Matches against row labels only; never touches the hosts list or its lock
+        t = self._pending_filter.lower()
+        root = QModelIndex()
+        self.tree.setUpdatesEnabled(False)
+        try:
+            for row in range(self.hosts_model.rowCount()):
+                hide = t not in self.hosts_model.label_at(row).lower()
+                # Only toggle rows whose state changes; each toggle relayouts
+                if self.tree.isRowHidden(row, root) != hide:
+                    self.tree.setRowHidden(row, root, hide)
+        finally:
+            self.tree.setUpdatesEnabled(True)
+
+    def _build_details_pane(self):
+        """Create the host details widgets once; show_details only updates them."""
+        # Frameless panel instead of a group box to remove header space
         details_group = QFrame()
         details_group.setFrameShape(QFrame.Shape.NoFrame)
         details_group.setFrameShadow(QFrame.Shadow.Raised)
-        details_group.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        details_group.setSizePolicy(QSizePolicy.Policy.Expanding,
+                           QSizePolicy.Policy.Minimum)
         details_group_layout = QVBoxLayout(details_group)
 
         # Apply internal margins to layout: left=18px, top=20px, right=18px, bottom=5px
@@ -1444,124 +1673,72 @@ class ScannerWindow(QMainWindow):
         details_group_layout.setSpacing(12)
         details_group_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
 
-        details_group.setSizePolicy(QSizePolicy.Policy.Expanding,
-                           QSizePolicy.Policy.Minimum)
-
         # Centered grid for host info
         grid = QGridLayout()
         grid.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
         grid.setHorizontalSpacing(24)
         grid.setVerticalSpacing(8)
-        # IP, Hostname, MAC, Ports (centered)
-        ip_lbl = QLabel("<b>IP:</b>")
-        ip_val = ElidedLabel(ip)
-        ip_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        ip_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        ip_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-        hn_lbl = QLabel("<b>Hostname:</b>")
-        hn_val = ElidedLabel(hostname)
-        hn_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        hn_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        hn_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-        # LocalHostname (mDNS)
-        mdns = host.get('mdns_name', '').strip()
-        lh_lbl = QLabel("<b>LocalHostname:</b>")
-        lh_val = ElidedLabel(mdns or '—')
-        lh_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        lh_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        lh_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-        mac_lbl = QLabel("<b>MAC:</b>")
-        mac_val = ElidedLabel(mac)
-        mac_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        mac_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        mac_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-        vendor_lbl = QLabel("<b>Vendor:</b>")
-        vendor_val = ElidedLabel(vendor)
-        vendor_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        vendor_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        vendor_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-
-        ports_scanned = len(COMMON_PORTS)
-        open_ports = [entry['port'] if isinstance(entry, dict) and 'port' in entry else entry for entry in host.get('ports', [])]
-        ports_open = len(open_ports)
-        ports_lbl = QLabel("<b>Open Ports:</b>")
-        ports_val = ElidedLabel(f"{ports_open} of {ports_scanned} scanned")
-        ports_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        ports_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        ports_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-
-        grid.addWidget(ip_lbl, 0, 0)
-        grid.addWidget(ip_val, 0, 1)
-        grid.addWidget(hn_lbl, 1, 0)
-        grid.addWidget(hn_val, 1, 1)
-        grid.addWidget(lh_lbl, 2, 0)
-        grid.addWidget(lh_val, 2, 1)
-        grid.addWidget(mac_lbl, 3, 0)
-        grid.addWidget(mac_val, 3, 1)
-        grid.addWidget(vendor_lbl, 4, 0)
-        grid.addWidget(vendor_val, 4, 1)
-        # Determine the model: host['model'], then Bonjour 'am', then mDNS 'model'
-        mdns_props = host.get('mdns_props', {})
-        model_prop = host.get('model') or mdns_props.get('am') or mdns_props.get('model', '')
-        model_lbl = QLabel("<b>Model:</b>")
-        model_val = ElidedLabel(model_prop or "—")
-        model_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse |
-            Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-        model_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        model_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        grid.addWidget(model_lbl, 5, 0)
-        grid.addWidget(model_val, 5, 1)
-        # OS label and value
-        os_lbl = QLabel("<b>OS:</b>")
-        os_val = ElidedLabel(host.get("os", "—"))
-        os_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        os_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        os_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
-        grid.addWidget(os_lbl, 6, 0)
-        grid.addWidget(os_val, 6, 1)
-        grid.addWidget(ports_lbl, 7, 0)
-        grid.addWidget(ports_val, 7, 1)
+        values = []
+        for row, title in enumerate(("IP", "Hostname", "LocalHostname", "MAC",
+                                     "Vendor", "Model", "OS", "Open Ports")):
+            lbl = QLabel(f"<b>{title}:</b>")
+            val = ElidedLabel("—")
+            lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+            grid.addWidget(lbl, row, 0)
+            grid.addWidget(val, row, 1)
+            values.append(val)
+        (self._ip_val, self._host_val, self._mdns_val, self._mac_val,
+         self._vendor_val, self._model_val, self._os_val, self._ports_val) = values
         details_group_layout.addLayout(grid)
 
         # Ports list row (centered)
-        # Use the same open_ports as above
         ports_list_lbl = QLabel("<b>Ports List:</b>")
-        ports_list_val = ElidedLabel(', '.join(str(p) for p in open_ports) if open_ports else "—")
+        self._ports_list_val = ElidedLabel("—")
         ports_list_lbl.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        ports_list_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        ports_list_val.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextSelectableByMouse | Qt.TextInteractionFlag.TextSelectableByKeyboard
-        )
+        self._ports_list_val.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
         ports_list_row = QHBoxLayout()
         ports_list_row.addWidget(ports_list_lbl)
-        ports_list_row.addWidget(ports_list_val)
+        ports_list_row.addWidget(self._ports_list_val)
         ports_list_row.addStretch()
         details_group_layout.addLayout(ports_list_row)
 
-        # 3. Action button row: Scan Ports, Ping, Connect (centered)
+        # Scan mode selection row (radio buttons + ports input)
+        scan_mode_row = QWidget()
+        sm_layout = QHBoxLayout(scan_mode_row)
+        sm_layout.setContentsMargins(0, 0, 0, 0)
+        sm_layout.setSpacing(8)
+        # Mode selectors
+        mode_label = QLabel("Scan Mode:")
+        sm_layout.addWidget(mode_label)
+        self.quick_rb = QRadioButton("Quick")
+        self.advanced_rb = QRadioButton("Advanced")
+        self.custom_rb = QRadioButton("Custom")
+        self.quick_rb.setChecked(True)
+        mode_group = QButtonGroup(self)
+        for rb in (self.quick_rb, self.advanced_rb, self.custom_rb):
+            mode_group.addButton(rb)
+            sm_layout.addWidget(rb)
+        # Ports input (only for Custom mode)
+        self.ports_input = QLineEdit()
+        self.ports_input.setPlaceholderText("e.g. 22,80,443")
+        self.ports_input.setFixedWidth(100)
+        self.ports_input.setEnabled(False)
+        self.ports_input.setFrame(True)
+        sm_layout.addWidget(self.ports_input)
+        sm_layout.addStretch()
+        # Only Custom takes a port list; one toggled connection covers all
+        # three radios since they are exclusive
+        self.custom_rb.toggled.connect(self.ports_input.setEnabled)
+
+        # Action button row: Scan Ports, Ping, Connect (centered)
         btn_row = QWidget()
         btn_hl = QHBoxLayout(btn_row)
         btn_hl.setContentsMargins(0, 0, 0, 0)
         btn_hl.setSpacing(16)
         self.port_scan_btn = QPushButton("Scan Ports", btn_row)
         self.port_scan_btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        self.port_scan_btn.clicked.connect(self.start_host_port_scan)
+        self.port_scan_btn.clicked.connect(lambda: self.start_host_port_scan())
         ping_btn = QPushButton("Ping", btn_row)
         ping_btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         ping_btn.clicked.connect(self.start_host_ping)
@@ -1583,99 +1760,122 @@ class ScannerWindow(QMainWindow):
         btn_hl.addWidget(toggle_log_btn)
         btn_hl.addStretch()
 
-        # 4. Per-host scan progress bar (hidden until scan starts)
+        # Per-host scan progress bar (hidden until scan starts)
         self.port_prog = QProgressBar(self.info_tab)
         self.port_prog.setRange(0, 0)  # indeterminate
         self.port_prog.hide()
 
-        # Add widgets directly to persistent self.info_layout
-        self.info_layout.addWidget(details_group, 1)
-        # Scan mode selection row (radio buttons + ports input)
-        scan_mode_row = QWidget()
-        sm_layout = QHBoxLayout(scan_mode_row)
-        sm_layout.setContentsMargins(0, 0, 0, 0)
-        sm_layout.setSpacing(8)
-        # Mode selectors
-        mode_label = QLabel("Scan Mode:")
-        sm_layout.addWidget(mode_label)
-        self.quick_rb = QRadioButton("Quick")
-        self.advanced_rb = QRadioButton("Advanced")
-        self.custom_rb = QRadioButton("Custom")
-        self.quick_rb.setChecked(True)
-        mode_group = QButtonGroup(self)
-        for rb in (self.quick_rb, self.advanced_rb, self.custom_rb):
-            mode_group.addButton(rb)
-            sm_layout.addWidget(rb)
-        # Ports input (only for Custom mode)
-        self.ports_input = QLineEdit()
-        self.ports_input.setPlaceholderText("e.g. 22,80,443")
-        self.ports_input.setFixedWidth(100)
-        self.ports_input.setEnabled(False)
-        self.ports_input.setFrame(True)
-        sm_layout.addWidget(self.ports_input)
-        sm_layout.addStretch()
-        # Toggle ports_input based on Custom selection
-        def toggle_ports():
-            self.ports_input.setEnabled(self.custom_rb.isChecked())
-        self.quick_rb.toggled.connect(toggle_ports)
-        self.advanced_rb.toggled.connect(toggle_ports)
-        self.custom_rb.toggled.connect(toggle_ports)
-        # Restore previous selection and update ports_input state
-        if getattr(self, 'last_scan_mode', 'quick') == 'custom':
-            self.custom_rb.setChecked(True)
-        elif getattr(self, 'last_scan_mode', 'quick') == 'advanced':
-            self.advanced_rb.setChecked(True)
-        else:
-            self.quick_rb.setChecked(True)
-        toggle_ports()
-
-        # Move scan_mode_row, btn_row, and self.port_prog inside the details_group
-        # so that scan controls and buttons are framed together
+        # Scan controls and buttons are framed together with the host info
         details_group_layout.addWidget(scan_mode_row)
         details_group_layout.addWidget(btn_row)
         details_group_layout.addWidget(self.port_prog)
         details_group_layout.addStretch()
 
-        # Ports tab: list each port entry
+        self.info_layout.addWidget(details_group, 1)
+        # Nothing to show until a host is selected
+        details_group.hide()
+        self._details_group = details_group
+
+    def show_details(self, current, _):
+        if not current.isValid():
+            return
+        ip = current.data(Qt.ItemDataRole.UserRole)
+        host = self._host_by_ip.get(ip, {})
+        # [DETAIL] Print showing details for host and its ports at INFO level
+        log.info(f"[DETAIL] Showing details for host: {host}")
+
+        # Port summary is built once per ports update and kept on the host
+        summary = host.get('_ports_summary')
+        if summary is None:
+            open_ports = [entry['port'] if isinstance(entry, dict) and 'port' in entry else entry for entry in host.get('ports', ())]
+            summary = (
+                f"{len(open_ports)} of {len(COMMON_PORTS)} scanned",
+                ', '.join(str(p) for p in open_ports) if open_ports else "—",
+            )
+            if host:
+                host['_ports_summary'] = summary
+        # Determine the model: host['model'], then Bonjour 'am', then mDNS 'model'
+        mdns_props = host.get('mdns_props') or _NO_PROPS
+        model_prop = host.get('model') or mdns_props.get('am') or mdns_props.get('model', '')
+
+        self._ip_val.setText(host.get('ip', '—'))
+        self._host_val.setText(host.get('hostname', '—'))
+        self._mdns_val.setText(host.get('mdns_name', '').strip() or '—')
+        self._mac_val.setText(host.get('mac', '—'))
+        self._vendor_val.setText(host.get('vendor', '—'))
+        self._model_val.setText(model_prop or "—")
+        self._os_val.setText(host.get("os") or "—")
+        self._ports_val.setText(summary[0])
+        self._ports_list_val.setText(summary[1])
+
+        # Scan button and progress bar follow the selected host's port scan
+        scanning = ip in self.host_port_threads
+        self.port_scan_btn.setEnabled(not scanning)
+        self.port_scan_btn.setText("Scanning..." if scanning else "Scan Ports")
+        self.port_prog.setVisible(scanning)
+        self._details_group.show()
+
+        # Ports tab: list each port entry, filled in one batch
+        labels = []
         for entry in host.get('ports', []):
             port = entry['port'] if isinstance(entry, dict) and 'port' in entry else entry
             name = entry['name'] if isinstance(entry, dict) and 'name' in entry else ""
-            item = QListWidgetItem(f"{port} {name}".strip())
-            self.ports_list.addItem(item)
+            labels.append(f"{port} {name}".strip())
+        self.ports_list.setUpdatesEnabled(False)
+        self.ports_list.blockSignals(True)
+        try:
+            self.ports_list.clear()
+            self.ports_list.addItems(labels)
+        finally:
+            self.ports_list.blockSignals(False)
+            self.ports_list.setUpdatesEnabled(True)
 
         # Add mDNS hostname to details text if present
         if hasattr(self, 'details_text'):
             if host.get("mdns_name"):
                 self.details_text.append(f"mDNS Hostname: {host['mdns_name']}")
     def start_os_detection(self):
-        current = self.tree.currentItem()
-        if not current:
+        current = self.tree.currentIndex()
+        if not current.isValid():
             return
-        ip = current.data(0, Qt.ItemDataRole.UserRole)
+        ip = current.data(Qt.ItemDataRole.UserRole)
         if not ip:
             return
         log.info(f"Starting OS detection for {ip}...")
-        thread = OSDetectThread(ip, self.nmap_path)
-        self._os_threads[ip] = thread
-        thread.result.connect(self.on_os_result)
-        thread.error.connect(self.on_error)
-        thread.finished.connect(lambda: self._os_threads.pop(ip, None))
-        thread.start()
+        task = OSDetectTask(ip, self.nmap_path)
+        self._os_threads[ip] = task
+        task.result.connect(self.on_os_result)
+        task.error.connect(self.on_error)
+        task.finished.connect(lambda: self._os_threads.pop(ip, None))
+        task.start()
+
+    def start_os_detection_all(self):
+        """Detect OS for every discovered host with a single batched nmap run."""
+        ips = [h['ip'] for h in self.hosts if h.get('ip') and h['ip'] not in self._os_threads]
+        if not ips:
+            return
+        log.info(f"Starting OS detection for {len(ips)} hosts...")
+        task = OSDetectTask(ips, self.nmap_path)
+        for ip in ips:
+            self._os_threads[ip] = task
+        task.result.connect(self.on_os_result)
+        task.error.connect(self.on_error)
+        task.finished.connect(lambda: [self._os_threads.pop(ip, None) for ip in ips])
+        task.start()
 
     def on_os_result(self, ip, os_info):
         log.info(f"Detected OS for {ip}: {os_info.get('os')} (accuracy {os_info.get('accuracy')}%)")
-        for h in self.hosts:
-            if h['ip'] == ip:
-                h['os'] = os_info.get('os')
-                break
-        current = self.tree.currentItem()
-        if current and current.data(0, Qt.ItemDataRole.UserRole) == ip:
+        host = self._host_by_ip.get(ip)
+        if host is not None:
+            host['os'] = os_info.get('os')
+        current = self.tree.currentIndex()
+        if current.data(Qt.ItemDataRole.UserRole) == ip:
             self.show_details(current, None)
     def start_host_ping(self):
-        current = self.tree.currentItem()
-        if not current:
+        current = self.tree.currentIndex()
+        if not current.isValid():
             return
-        ip = current.data(0, Qt.ItemDataRole.UserRole)
+        ip = current.data(Qt.ItemDataRole.UserRole)
         if not ip:
             return
 
@@ -1695,11 +1895,21 @@ class ScannerWindow(QMainWindow):
         self.ping_proc.start('ping', ['-c', '4', ip])
 
     def _handle_ping_output(self):
-        data = bytes(self.ping_proc.readAllStandardOutput()).decode('utf-8')
-        for line in data.splitlines():
+        data = bytes(self.ping_proc.readAllStandardOutput()).decode('utf-8', errors='replace')
+        self._ping_buf.extend(data.splitlines())
+        if not self._ping_flush_timer.isActive():
+            self._ping_flush_timer.start()
+
+    def _flush_ping_output(self):
+        # One record per line: the log area renders records as HTML, where
+        # a newline inside a record would not break the line
+        self._ping_flush_timer.stop()
+        lines, self._ping_buf = self._ping_buf, []
+        for line in lines:
             log.info(line)
 
     def _handle_ping_finished(self, button, exit_code, exit_status):
+        self._flush_ping_output()
         if exit_status != QProcess.ExitStatus.NormalExit or exit_code != 0:
             log.warning("Ping failed or host did not respond.")
         else:
@@ -1712,15 +1922,16 @@ class ScannerWindow(QMainWindow):
             except RuntimeError:
                 pass
 
-    def start_host_port_scan(self):
-        current = self.tree.currentItem()
-        if not current:
+    def start_host_port_scan(self, force=False):
+        """Scan the selected host's ports; force skips a cached recent result."""
+        current = self.tree.currentIndex()
+        if not current.isValid():
             return
-        ip = current.data(0, Qt.ItemDataRole.UserRole)
+        ip = current.data(Qt.ItemDataRole.UserRole)
         if not ip:
             return
         clean_ip = ip.strip()
-        host = next((h for h in self.hosts if h['ip'] == clean_ip), {})
+        host = self._host_by_ip.get(clean_ip, {})
 
         if DEBUG:
             logging.debug(f"Active threads: {list(self.host_port_threads.keys())}")
@@ -1728,71 +1939,90 @@ class ScannerWindow(QMainWindow):
         # Launch per-host port scan thread if not already running
         if clean_ip in self.host_port_threads:
             return
-        t = HostPortThread(clean_ip, self.rs_path, self)
-        # Pass custom ports to thread if Custom mode is selected
-        if self.custom_rb.isChecked():
-            text = self.ports_input.text().strip()
-            parsed = []
-            for part in text.split(','):
-                try:
-                    num = int(part.strip())
-                    parsed.append(num)
-                except ValueError:
-                    pass
-            t.custom_ports = parsed
-        else:
-            t.custom_ports = None
+        t = HostPortTask(clean_ip, self.rs_path, self._scan_ports(), force=force)
         self.host_port_threads[clean_ip] = t
         # Bind result/error to methods that handle per-host update
-        t.result.connect(lambda ip, ports: self.on_host_ports_multi(ip, ports))
+        t.result.connect(self.on_host_ports_multi)
+        t.port_found.connect(self.on_host_port_found)
+        t.warning.connect(self.on_scan_warning)
         t.error.connect(self.on_error)
-        t.ip = clean_ip
-        t.finished.connect(self.on_thread_finished)
+        t.finished.connect(lambda ip=clean_ip: self.on_thread_finished(ip))
         t.start()
         # Disable scan button and show progress immediately, but only for the currently selected host
         self.port_scan_btn.setEnabled(False)
         self.port_scan_btn.setText("Scanning...")
         self.port_prog.show()
 
-    def on_thread_finished(self):
-        thread = self.sender()
-        # Ensure the thread has fully terminated before cleanup
-        try:
-            thread.wait()
-        except Exception:
-            pass
-        ip = getattr(thread, "ip", None)
-        clean_ip = ip.strip() if isinstance(ip, str) else ip
-        if clean_ip and clean_ip in self.host_port_threads:
-            self.host_port_threads.pop(clean_ip)
-        # Re-enable Scan Ports button and reset its text
-        if hasattr(self, 'port_scan_btn'):
+    def start_host_port_scan_all(self):
+        """Scan ports on every discovered host with a single batched RustScan run."""
+        ips = [h['ip'] for h in self.hosts if h.get('ip') and h['ip'] not in self.host_port_threads]
+        if not ips:
+            return
+        log.info(f"Starting port scan for {len(ips)} hosts...")
+        t = HostPortTask(ips, self.rs_path, self._scan_ports())
+        for ip in ips:
+            self.host_port_threads[ip] = t
+        t.result.connect(self.on_host_ports_multi)
+        t.port_found.connect(self.on_host_port_found)
+        t.warning.connect(self.on_scan_warning)
+        t.error.connect(self.on_error)
+        t.finished.connect(lambda: [self.on_thread_finished(ip) for ip in ips])
+        t.start()
+        # Reflect the running scan on the selected host's controls
+        self.show_details(self.tree.currentIndex(), None)
+
+    def _scan_ports(self):
+        """Ports for the selected scan mode: the typed list, advanced or quick."""
+        if self.custom_rb.isChecked():
+            parsed = []
+            for part in self.ports_input.text().strip().split(','):
+                try:
+                    parsed.append(int(part.strip()))
+                except ValueError:
+                    pass
+            return parsed
+        if self.advanced_rb.isChecked():
+            return COMMON_PORTS
+        return QUICK_PORTS
+
+    def on_thread_finished(self, clean_ip):
+        self.host_port_threads.pop(clean_ip, None)
+        self._live_ports.pop(clean_ip, None)
+        # Scan Ports button and progress bar follow the selected host
+        if self.tree.currentIndex().data(Qt.ItemDataRole.UserRole) not in self.host_port_threads:
             self.port_scan_btn.setEnabled(True)
             self.port_scan_btn.setText("Scan Ports")
-        # Hide the per-host port progress bar
-        if hasattr(self, 'port_prog'):
             self.port_prog.hide()
 
+    def on_host_port_found(self, ip, port, name):
+        """Show a port as soon as RustScan reports it; the scan's result replaces the list."""
+        host = self._host_by_ip.get(ip)
+        if host is None:
+            return
+        found = self._live_ports.setdefault(ip, [])
+        # Kept in port order as ports arrive, the same order the final result uses
+        bisect.insort(found, {'port': port, 'name': name}, key=lambda e: e['port'])
+        host['ports'] = found
+        host.pop('_ports_summary', None)
+        current = self.tree.currentIndex()
+        if current.data(Qt.ItemDataRole.UserRole) == ip:
+            self.show_details(current, None)
+
     def on_host_ports_multi(self, ip, ports):
         # Always use stripped IP for consistency
         clean_ip = ip.strip() if isinstance(ip, str) else ip
         # Update the matching host entry
         # 'ports' is already the list of port entries
         # # Ensure all port entries are dicts for GUI compatibility
-        ports = [{'port': p, 'name': SERVICE_NAMES.get(p, '')} if isinstance(p, int) else p for p in ports]
-        for h in self.hosts:
-            if h['ip'] == clean_ip:
-                h['ports'] = ports
-                break
-        # Save updated hosts list including ports to temp file
-        self._temp_file.seek(0)
-        json.dump(self.hosts, self._temp_file)
-        self._temp_file.truncate()
-        self._temp_file.flush()
+        ports = [_port_entry(p) if isinstance(p, int) else p for p in ports]
+        host = self._host_by_ip.get(clean_ip)
+        if host is not None:
+            host['ports'] = ports
+            host.pop('_ports_summary', None)
         # If this host is currently selected, refresh its details
-        current = self.tree.currentItem()
-        if current:
-            value = current.data(0, Qt.ItemDataRole.UserRole)
+        current = self.tree.currentIndex()
+        if current.isValid():
+            value = current.data(Qt.ItemDataRole.UserRole)
             if isinstance(value, str) and value.strip() == clean_ip:
                 self.show_details(current, None)
                 if hasattr(self, 'port_scan_btn'):
@@ -1801,70 +2031,52 @@ class ScannerWindow(QMainWindow):
                 if hasattr(self, 'port_prog'):
                     self.port_prog.hide()
 
+    def _export_json(self, path, hosts):
+        """Write hosts as a JSON array straight from memory, without the cached _ keys."""
+        hosts = [{k: v for k, v in h.items() if not k.startswith('_')} for h in hosts]
+        if orjson:
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(hosts, option=orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(hosts, f)
+
     # --- Export scan results method ---
     def export_scan_results(self):
-        # Prompt user to save the temp file contents
+        # Prompt user for where to save the current scan results
         path, _ = QFileDialog.getSaveFileName(
             self, "Save Scan Results", "",
             "JSON Files (*.json);;CSV Files (*.csv);;Excel Files (*.xlsx);;All Files (*)"
         )
         if path:
-            # Ensure temp file is flushed
-            self._temp_file.flush()
             ext = os.path.splitext(path)[1].lower()
-            # Prepare data
-            data = self._temp_file.readable() and None  # not used
-            hosts = self.hosts
+            hosts = self._hosts_snapshot
             if ext == '.json' or ext == "":
-                # Copy temp file to chosen location
-                shutil.copy(self._temp_file.name, path)
+                self._export_json(path, hosts)
             elif ext == '.csv':
                 with open(path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=['ip','hostname','mac','vendor','ports'])
-                    writer.writeheader()
-                    for h in hosts:
-                        # Flatten ports list to semicolon-separated string of ports
-                        ports_str = ';'.join(str(p['port']) if isinstance(p, dict) else str(p) for p in h.get('ports', []))
-                        row = {
-                            'ip': h.get('ip',''),
-                            'hostname': h.get('hostname',''),
-                            'mac': h.get('mac',''),
-                            'vendor': h.get('vendor',''),
-                            'ports': ports_str
-                        }
-                        writer.writerow(row)
+                    writer = csv.writer(f)
+                    writer.writerow(_EXPORT_FIELDS)
+                    writer.writerows(_export_row(h) for h in hosts)
             elif ext == '.xlsx':
                 if pd:
-                    df = pd.DataFrame([
-                        {
-                            'ip': h.get('ip',''),
-                            'hostname': h.get('hostname',''),
-                            'mac': h.get('mac',''),
-                            'vendor': h.get('vendor',''),
-                            'ports': ';'.join(str(p['port']) if isinstance(p, dict) else str(p) for p in h.get('ports', []))
-                        } for h in hosts
-                    ])
+                    df = pd.DataFrame.from_records(
+                        [_export_row(h) for h in hosts], columns=_EXPORT_FIELDS
+                    )
                     df.to_excel(path, index=False)
                 else:
                     QMessageBox.warning(self, "Missing Dependency", "Pandas is required to export Excel files. Please install pandas and try again.")
                     return
             else:
                 # Default: treat as JSON
-                shutil.copy(self._temp_file.name, path)
+                self._export_json(path, hosts)
             os.chmod(path, 0o644)
             QMessageBox.information(self, "Export Complete", f"Scan results saved to {path}")
 
 
     def clear_details(self):
-        # Safely remove widgets from the persistent info_layout
-        old_layout = self.info_layout
-        if old_layout is not None:
-            while old_layout.count():
-                child = old_layout.takeAt(0)
-                if child.widget():
-                    child.widget().setParent(None)
-                elif child.layout():
-                    child.layout().setParent(None)
+        # Hide the details pane; its widgets are kept for the next selection
+        self._details_group.hide()
         # Clear Ports tab list
         self.ports_list.clear()
 
@@ -1891,16 +2103,16 @@ def on_error(self, msg):
         ip = data['ip']
         ports = data['ports']
         # Ensure all port entries are dicts for GUI compatibility
-        ports = [{'port': p, 'name': SERVICE_NAMES.get(p, '')} if isinstance(p, int) else p for p in ports]
+        ports = [_port_entry(p) if isinstance(p, int) else p for p in ports]
         # Update the matching host entry
-        for h in self.hosts:
-            if h['ip'] == ip:
-                h['ports'] = ports
-                break
+        host = self._host_by_ip.get(ip)
+        if host is not None:
+            host['ports'] = ports
+            host.pop('_ports_summary', None)
         # Refresh detail pane if this host is selected
-        current = self.tree.currentItem()
+        current = self.tree.currentIndex()
         # Keep ports results displayed persistently (do not clear on scan)
-        if current and current.data(0, Qt.ItemDataRole.UserRole) == ip:
+        if current.data(Qt.ItemDataRole.UserRole) == ip:
             self.show_details(current, None)
         # Re-enable button and hide port progress bar
         if hasattr(self, 'scan_btn'):
@@ -1919,13 +2131,13 @@ def on_error(self, msg):
             self.log_area.show()
 
     def connect_to_host(self):
-        current = self.tree.currentItem()
-        if not current:
+        current = self.tree.currentIndex()
+        if not current.isValid():
             return
-        ip = current.data(0, Qt.ItemDataRole.UserRole)
+        ip = current.data(Qt.ItemDataRole.UserRole)
         if not ip:
             return
-        host = next((h for h in self.hosts if h['ip'] == ip), {})
+        host = self._host_by_ip.get(ip, {})
         # Prefer domain (hostname or mDNS) when opening web ports
         display = host.get('hostname') or host.get('mdns_name') or ip
         ports = host.get('ports', [])
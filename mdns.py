@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 
+import asyncio
+import json
+import os
+import socket
 import time
-from zeroconf import Zeroconf, ServiceBrowser, ServiceListener
+from zeroconf import Zeroconf, ServiceBrowser, ServiceListener, ServiceStateChange
+from zeroconf.asyncio import AsyncZeroconf, AsyncServiceBrowser, AsyncServiceInfo
 from PyQt6.QtCore import QThread, pyqtSignal
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class TypeListener(ServiceListener):
     """Collects all advertised service types."""
     def __init__(self):
@@ -56,72 +66,148 @@ def discover_all_mdns(timeout: float = 5.0):
     zc.close()
     return host_listener.hosts
 
+# Per-IP mDNS results kept between runs: {ip: {'ts', 'ttl', 'hostname', 'services', 'mdns_props'}}
+MDNS_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config'),
+    'inetscan', 'mdns_cache.json'
+)
+# Service record TTL recommended by RFC 6762 (75 minutes)
+MDNS_RECORD_TTL = 4500
+
+def load_mdns_cache(path=MDNS_CACHE_PATH):
+    """Return the cached entries that are still within their TTL."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        cache = orjson.loads(data) if orjson else json.loads(data)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    now = time.time()
+    fresh = {}
+    for ip, entry in cache.items():
+        if not isinstance(entry, dict):
+            continue
+        # Fill in missing stamps so later expiry checks can index them
+        ts = entry.get('ts', 0)
+        ttl = entry.get('ttl', MDNS_RECORD_TTL)
+        if not isinstance(ts, (int, float)) or not isinstance(ttl, (int, float)):
+            continue
+        if now - ts < ttl:
+            entry['ts'], entry['ttl'] = ts, ttl
+            fresh[ip] = entry
+    return fresh
+
+def save_mdns_cache(cache, path=MDNS_CACHE_PATH):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(cache) if orjson else json.dumps(cache).encode('utf-8'))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
 class MDNSWorker(QThread):
     """
-    QThread that performs mDNS discovery and emits found ServiceInfo.
+    QThread that performs mDNS discovery and emits per-host results.
     """
-    host_found = pyqtSignal(str, object)  # service name and ServiceInfo
+    host_found = pyqtSignal(str, object)  # IP and its merged mDNS entry so far
     discovery_finished = pyqtSignal()
     mdns_done = pyqtSignal(dict)  # emit the complete host info dict
 
-    def __init__(self, timeout: float = 5.0):
+    def __init__(self, timeout: float = 5.0, cache=None):
         super().__init__()
         self.timeout = timeout
+        # Unexpired entries from earlier runs, answered before browsing starts
+        self.cache = cache or {}
 
     def run(self):
-        zc = Zeroconf()
-        # Phase 1: Discover service types
-        type_listener = TypeListener()
-        ServiceBrowser(zc, "_services._dns-sd._udp.local.", type_listener)
-        time.sleep(self.timeout)
-
-        # Debug: show discovered service types
-        print(f"[DEBUG] Discovered service types: {type_listener.types}")
-
-        # Phase 2: Discover instances for each type
-        instance_listener = HostListener()
-        for svc_type in type_listener.types:
-            ServiceBrowser(zc, svc_type, instance_listener)
-        time.sleep(self.timeout)
-
-        # Debug: show discovered service names before lookup
-        print(f"[DEBUG] Discovered service names: {list(instance_listener.hosts.keys())}")
-
-        # Phase 3: Deferred lookups under timeout
-        for svc_type in list(type_listener.types):
-            for name in list(instance_listener.hosts.keys()):
-                try:
-                    info = zc.get_service_info(svc_type, name, timeout=int(self.timeout * 1000))
-                except Exception:
-                    continue
-                if info:
-                    instance_listener.hosts[name] = info
-
-        # Skip entries with no lookup info
-        hosts = {}
-        for name, info in instance_listener.hosts.items():
-            if info is None or not getattr(info, 'addresses', None):
-                continue
-            ip = ".".join(str(b) for b in info.addresses[0])
-            hostname = info.server.rstrip('.')
-            # Collect TXT properties
-            props = {}
-            for k, v in (info.properties or {}).items():
-                if k is None or v is None:
-                    continue
-                key = k.decode('utf-8', errors='ignore') if isinstance(k, bytes) else str(k)
-                val = v.decode('utf-8', errors='ignore') if isinstance(v, bytes) else str(v)
-                props[key] = val
-
-            entry = hosts.setdefault(ip, {
-                'hostname': hostname,
-                'services': [],
-                'mdns_props': {}
-            })
-            entry['services'].append(info.type)
-            entry['mdns_props'].update(props)
-
+        for ip, entry in self.cache.items():
+            self.host_found.emit(ip, entry)
+        # Requires python-zeroconf ≥0.38
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            hosts = loop.run_until_complete(self._discover())
+        finally:
+            loop.close()
+
+        # Cached hosts that did not answer this time keep their entry until it expires
+        for ip, entry in self.cache.items():
+            hosts.setdefault(ip, entry)
         # Emit the complete mapping
         self.mdns_done.emit(hosts)
-        zc.close()
-        self.discovery_finished.emit()
\ No newline at end of file
+        self.discovery_finished.emit()
+
+    async def _discover(self):
+        """
+        Browse every announced service type concurrently on one loop and
+        resolve instances as they appear, so the whole run costs about one
+        timeout window instead of one per type and per lookup.
+        """
+        aiozc = AsyncZeroconf()
+        hosts = {}
+        subscribed = set()
+        browsers = []
+        tasks = set()
+        timeout_ms = int(self.timeout * 1000)
+
+        async def resolve(stype, name):
+            info = AsyncServiceInfo(stype, name)
+            if await info.async_request(aiozc.zeroconf, timeout_ms):
+                self._add_info(hosts, info)
+
+        def on_service(zeroconf, service_type, name, state_change):
+            if state_change is ServiceStateChange.Added:
+                task = asyncio.ensure_future(resolve(service_type, name))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        def on_type(zeroconf, service_type, name, state_change):
+            # Start browsing each service type as soon as it is announced
+            if state_change is ServiceStateChange.Added and name not in subscribed:
+                subscribed.add(name)
+                browsers.append(AsyncServiceBrowser(aiozc.zeroconf, name, handlers=[on_service]))
+
+        browsers.append(AsyncServiceBrowser(
+            aiozc.zeroconf, "_services._dns-sd._udp.local.", handlers=[on_type]
+        ))
+        await asyncio.sleep(self.timeout)
+        # Let lookups already in flight finish; each is bounded by the timeout
+        if tasks:
+            await asyncio.wait(list(tasks), timeout=self.timeout)
+
+        for browser in browsers:
+            await browser.async_cancel()
+        for task in list(tasks):
+            task.cancel()
+        await aiozc.async_close()
+        return hosts
+
+    def _add_info(self, hosts, info):
+        """Fold one resolved ServiceInfo into the per-IP mapping and report it."""
+        addr = next((a for a in info.addresses or () if len(a) == 4), None)
+        if addr is None:
+            return
+        ip = socket.inet_ntoa(addr)
+        hostname = (info.server or '').rstrip('.')
+        # Collect TXT properties; zeroconf hands keys and values over as bytes
+        dec = bytes.decode
+        props = {
+            (dec(k, 'utf-8', 'ignore') if isinstance(k, bytes) else str(k)):
+            (dec(v, 'utf-8', 'ignore') if isinstance(v, bytes) else str(v))
+            for k, v in (info.properties or {}).items()
+            if k is not None and v is not None
+        }
+
+        entry = hosts.setdefault(ip, {
+            'hostname': hostname,
+            'services': [],
+            'mdns_props': {}
+        })
+        entry['services'].append(info.type)
+        entry['mdns_props'].update(props)
+        self.host_found.emit(ip, dict(entry, services=list(entry['services']),
+                                      mdns_props=dict(entry['mdns_props'])))
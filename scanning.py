@@ -2,13 +2,23 @@
 
 #!/usr/bin/env python3
 
+import ipaddress
 import re
 import socket
-import subprocess
+import sys
 import os
 import shutil
 import json
-from PyQt6.QtCore import QThread, pyqtSignal
+import marshal
+import time
+from functools import lru_cache
+import xml.etree.ElementTree as ET
+from PyQt6.QtCore import QObject, QProcess, pyqtSignal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Initialize manuf parser if available
 try:
@@ -17,122 +27,317 @@ try:
 except ImportError:
     mac_parser = None
 
-# Load extra OUI overrides
-script_dir = os.path.dirname(os.path.abspath(__file__))
-extra_oui = {}
-for fname in ('oui_extra.json', 'mac_overrides.json'):
-    path = os.path.join(script_dir, fname)
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+# Strips MAC/OUI separators in a single pass
+_MAC_CLEAN = str.maketrans('', '', '-:.\t ')
+
+def load_json(path):
+    """Parse a JSON data file, via orjson when available."""
+    if orjson:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# Normalized tables are cached here, keyed by the source files' mtimes
+cache_dir = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'inetscan'
+)
+
+def _load_extra_oui(paths):
+    table = {}
+    for path in paths:
+        try:
+            data = load_json(path)
             for k, v in data.items():
-                extra_oui[k.upper().replace('-', '').replace(':', '')] = v
-    except:
-        continue
+                table[k.translate(_MAC_CLEAN).upper()] = v
+        except:
+            continue
+    return table
 
-# Load Apple OUI-to-model map
-apple_model_map = {}
-try:
-    with open(os.path.join(script_dir, 'apple_models.json'), 'r', encoding='utf-8') as f:
-        apple_model_map = {
-            k.upper().replace('-', '').replace(':', ''): v
-            for k, v in json.load(f).items()
+def load_cached_table(name, paths, build):
+    """Return build(paths), reusing a marshal cache while no source file has changed."""
+    stamp = '-'.join(
+        str(os.stat(p).st_mtime_ns) if os.path.exists(p) else '0' for p in paths
+    )
+    cache_path = os.path.join(cache_dir, f"{name}-{stamp}.marshal")
+    try:
+        with open(cache_path, 'rb') as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    table = build(paths)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop caches built from older versions of the sources
+        for old in os.listdir(cache_dir):
+            if old.startswith(f"{name}-") and old.endswith('.marshal'):
+                os.remove(os.path.join(cache_dir, old))
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(table, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return table
+
+def _load_apple_models(path):
+    try:
+        return {
+            k.translate(_MAC_CLEAN).upper(): v
+            for k, v in load_json(path).items()
         }
-except:
-    pass
+    except:
+        return {}
+
+def _build_oui_table(paths):
+    """
+    Pack the OUI overrides and the Apple model map into one int-keyed
+    table: 24-bit OUI -> (override vendor, Apple model or None).
+    """
+    *oui_paths, apple_path = paths
+    oui24 = {}
+    for k, vendor in _load_extra_oui(oui_paths).items():
+        if len(k) != 6:
+            continue
+        try:
+            oui24[int(k, 16)] = (vendor, None)
+        except ValueError:
+            continue
+    for k, model in _load_apple_models(apple_path).items():
+        try:
+            n = int(k, 16)
+        except ValueError:
+            continue
+        oui24[n] = (oui24.get(n, ('', None))[0], model)
+    return oui24
 
+# Load extra OUI overrides and Apple models as one packed table
+script_dir = os.path.dirname(os.path.abspath(__file__))
+oui_table = load_cached_table(
+    'oui24',
+    [os.path.join(script_dir, f)
+     for f in ('oui_extra.json', 'mac_overrides.json', 'apple_models.json')],
+    _build_oui_table
+)
+
+def lookup_oui(clean_mac):
+    """(override vendor, Apple model or None) for a separator-free MAC or OUI prefix."""
+    try:
+        return oui_table.get(int(clean_mac[:6], 16), ('', None))
+    except ValueError:
+        return '', None
+
+# Reverse-DNS names nmap reported recently: ip -> (time seen, name). Shared
+# by every ScanThread so rescans and ARP-prefilled rows have names at once
+_RDNS_CACHE = {}
+_RDNS_TTL = 300
+
+def cached_rdns(ip):
+    """Name recently resolved for ip, or '' if unknown or expired."""
+    entry = _RDNS_CACHE.get(ip)
+    if entry and time.monotonic() - entry[0] < _RDNS_TTL:
+        return entry[1]
+    return ''
+
+def remember_rdns(ip, name):
+    _RDNS_CACHE[ip] = (time.monotonic(), name)
+
+@lru_cache(maxsize=1)
 def get_privilege_wrapper():
-    """Return 'doas' or 'sudo' if not running as root, else None."""
+    """Return 'doas' or 'sudo' if not running as root, else None. Looked up once per run."""
     return shutil.which('doas') or shutil.which('sudo') if os.geteuid() != 0 else None
 
-class ScanThread(QThread):
+# Neighbor (ARP) table entries: Linux `ip neigh` and BSD/macOS `arp -an`
+_NEIGH_RX = re.compile(r'^(?P<ip>\d+(?:\.\d+){3})\s.*?\blladdr\s+(?P<mac>[0-9a-fA-F:]+)', re.MULTILINE)
+_ARP_RX = re.compile(r'\((?P<ip>\d+(?:\.\d+){3})\)\s+at\s+(?P<mac>[0-9a-fA-F]{1,2}(?::[0-9a-fA-F]{1,2}){5})')
+
+def neighbor_table_command():
+    """Return (program, args) that prints the OS neighbor/ARP cache."""
+    if sys.platform.startswith('linux') and shutil.which('ip'):
+        return 'ip', ['neigh', 'show']
+    return 'arp', ['-an']
+
+def parse_neighbor_table(text, network):
+    """Build host entries for neighbor-table IP/MAC pairs that fall inside network."""
+    if isinstance(network, str):
+        network = ipaddress.ip_network(network, strict=False)
+    # Membership as one mask-and-compare on ints instead of address objects
+    net_int = int(network.network_address)
+    mask_int = int(network.netmask)
+    hosts = []
+    seen = set()
+    for rx in (_NEIGH_RX, _ARP_RX):
+        for m in rx.finditer(text):
+            ip = m.group('ip')
+            if ip in seen:
+                continue
+            try:
+                ip_int = int.from_bytes(socket.inet_aton(ip), 'big')
+            except OSError:
+                continue
+            if ip_int & mask_int != net_int:
+                continue
+            seen.add(ip)
+            # arp on BSD/macOS drops leading zeros ("0:1b:...")
+            mac = ':'.join(part.zfill(2) for part in m.group('mac').split(':')).upper()
+            host = {
+                'ip': ip,
+                'hostname': cached_rdns(ip),
+                'mac': '',
+                'ports': [],
+                'vendor': '',
+                'model': ''
+            }
+            apply_mac(host, mac)
+            hosts.append(host)
+    return hosts
+
+def apply_mac(host, mac, vendor_inline=None):
+    """Set host's MAC and derive vendor/model from OUI tables and mDNS props."""
+    host['mac'] = mac
+    # Vendor lookup
+    vendor = vendor_inline or (mac_parser.get_manufacturer(mac)
+                               if mac_parser else '')
+    override, apple_model = lookup_oui(mac.translate(_MAC_CLEAN))
+    if not vendor:
+        vendor = override
+    if not vendor:
+        vendor = host.get('mdns_props', {}).get('vn', '')
+    if not vendor and apple_model is not None:
+        vendor = 'Apple'
+    host['vendor'] = vendor
+    # Model lookup
+    model = host.get('mdns_props', {}).get('model', '')
+    if not model and apple_model is not None:
+        model = apple_model
+    host['model'] = model or ''
+
+class ScanThread(QObject):
+    """
+    nmap host discovery driven by a QProcess on the GUI event loop.
+
+    Keeps the QThread-style start()/isRunning()/stop() surface the window
+    uses, but needs no Python thread: XML output is fed to a pull parser
+    as it arrives and each <host> is handled as soon as it is complete.
+    """
     result = pyqtSignal(dict)
     error = pyqtSignal(str)
     discovery_finished = pyqtSignal()
     discovery_update = pyqtSignal(str)
 
-    def __init__(self, subnet, rs_path, nmap_path, scan_flags=None):
-        super().__init__()
+    # default: ICMP, SYN, UDP, and ARP probes
+    DEFAULT_PROBES = ['-PE', '-PS80,443', '-PU53', '-PR']
+
+    def __init__(self, subnet, rs_path, nmap_path, scan_flags=None, known_hosts=None, parent=None):
+        super().__init__(parent)
         self.subnet = subnet
         self.rs_path = rs_path
         self.nmap_path = nmap_path
         # Custom probe flags for this scan pass
         self.scan_flags = scan_flags
         self.wrapper = get_privilege_wrapper()
-        self.hosts = []
-        self.seen_ips = set()
+        # Hosts already known (e.g. from the ARP cache) are kept first, in order
+        self.hosts = list(known_hosts or [])
+        self._by_ip = {h['ip']: h for h in self.hosts}
+        self.seen_ips = set(self._by_ip)
+        self._parser = None
+        self._stopped = False
+        self.proc = QProcess(self)
+        self.proc.setStandardErrorFile(QProcess.nullDevice())
+        self.proc.readyReadStandardOutput.connect(self._read_output)
+        self.proc.finished.connect(self._on_finished)
+        self.proc.errorOccurred.connect(self._on_process_error)
+
+    def start(self):
+        # Build the discovery command
+        cmd = [self.nmap_path, '-sn']
+        # use only the provided probe flags, else the defaults
+        cmd += self.scan_flags or self.DEFAULT_PROBES
+        # System resolver names hosts the way gethostbyaddr would, so no
+        # blocking reverse lookups are needed on the GUI thread
+        cmd += ['--system-dns', '-oX', '-', self.subnet]
+        if self.wrapper:
+            cmd = [self.wrapper] + cmd
+        self._parser = ET.XMLPullParser(events=('end',))
+        self.proc.start(cmd[0], cmd[1:])
 
-    def run(self):
+    def isRunning(self):
+        return self.proc.state() != QProcess.ProcessState.NotRunning
+
+    def stop(self):
+        """Terminate nmap without emitting discovery_finished."""
+        self._stopped = True
+        if self.isRunning():
+            # SIGTERM is relayed by sudo/doas; SIGKILL would only hit the wrapper
+            self.proc.terminate()
+            if not self.proc.waitForFinished(2000):
+                self.proc.kill()
+                self.proc.waitForFinished(1000)
+
+    def _read_output(self):
         try:
-            # Build the discovery command
-            cmd = [self.nmap_path, '-sn']
-            if self.scan_flags:
-                # use only the provided probe flags
-                cmd += self.scan_flags
-            else:
-                # default: ICMP, SYN, UDP, and ARP probes
-                cmd += ['-PE', '-PS80,443', '-PU53', '-PR']
-            cmd.append(self.subnet)
-            if self.wrapper:
-                cmd = [self.wrapper] + cmd
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                    text=True, bufsize=1)
-        except Exception as e:
-            self.error.emit(f"Nmap discovery failed: {e}")
+            self._parser.feed(bytes(self.proc.readAllStandardOutput()))
+        except ET.ParseError as e:
+            if not self._stopped:
+                self.error.emit(f"Nmap discovery output could not be parsed: {e}")
+            self._stopped = True
+            self.proc.kill()
             return
+        # One result per chunk of output carrying only the hosts it completed
+        changed = {}
+        for _, elem in self._parser.read_events():
+            if elem.tag == 'host':
+                host = self._handle_host(elem)
+                if host is not None:
+                    changed[host['ip']] = host
+                elem.clear()
+        if changed:
+            self.result.emit({'hosts': list(changed.values())})
+
+    def _on_finished(self, exit_code, exit_status):
+        if not self._stopped:
+            self.discovery_finished.emit()
+
+    def _on_process_error(self, err):
+        if err == QProcess.ProcessError.FailedToStart:
+            self.error.emit(f"Nmap discovery failed: {self.proc.errorString()}")
 
-        for line in proc.stdout:
-            m = re.match(
-                r"Nmap scan report for (?P<host>[^ ]+)"
-                r"(?: \((?P<ip>[\d\.]+)\))?", line
-            )
-            if m:
-                raw = m.group('host')
-                ip = (m.group('ip') or raw).strip()
-                if ip not in self.seen_ips:
-                    self.seen_ips.add(ip)
-                    try:
-                        rdns = socket.gethostbyaddr(ip)[0]
-                    except:
-                        rdns = ''
-                    host = {
-                        'ip': ip,
-                        'hostname': rdns,
-                        'mac': '',
-                        'ports': [],
-                        'vendor': '',
-                        'model': ''
-                    }
-                    self.hosts.append(host)
-                    self.result.emit({'hosts': self.hosts.copy()})
-                    self.discovery_update.emit(f"Discovered {ip} ({rdns})")
-
-            m2 = re.search(
-                r"MAC Address:\s*([0-9A-F:]+)"
-                r"(?:\s*\(([^)]+)\))?", line
-            )
-            if m2 and self.hosts:
-                mac = m2.group(1)
-                host = self.hosts[-1]
-                host['mac'] = mac
-                # Vendor lookup
-                vendor_inline = m2.group(2)
-                vendor = vendor_inline or (mac_parser.get_manufacturer(mac)
-                                          if mac_parser else '')
-                prefix = mac.replace(':', '').upper()[:6]
-                if not vendor:
-                    vendor = extra_oui.get(prefix, '')
-                if not vendor:
-                    vendor = host.get('mdns_props', {}).get('vn', '')
-                if not vendor and prefix in apple_model_map:
-                    vendor = 'Apple'
-                host['vendor'] = vendor
-                # Model lookup
-                model = host.get('mdns_props', {}).get('model', '')
-                if not model and prefix in apple_model_map:
-                    model = apple_model_map[prefix]
-                host['model'] = model or ''
-                self.result.emit({'hosts': self.hosts.copy()})
-
-        proc.wait()
-        self.discovery_finished.emit()
\ No newline at end of file
+    def _handle_host(self, elem):
+        """Record an up host from a <host> element and return its dict."""
+        status = elem.find('status')
+        if status is not None and status.get('state') != 'up':
+            return None
+        addr = elem.find("address[@addrtype='ipv4']")
+        if addr is None:
+            return None
+        ip = addr.get('addr')
+        name_elem = elem.find('hostnames/hostname')
+        name = name_elem.get('name', '') if name_elem is not None else ''
+        if name:
+            remember_rdns(ip, name)
+        else:
+            # nmap's lookup can time out; reuse a name from a recent scan
+            name = cached_rdns(ip)
+        if ip not in self.seen_ips:
+            self.seen_ips.add(ip)
+            rdns = name
+            host = {
+                'ip': ip,
+                'hostname': rdns,
+                'mac': '',
+                'ports': [],
+                'vendor': '',
+                'model': ''
+            }
+            self.hosts.append(host)
+            self._by_ip[ip] = host
+            self.discovery_update.emit(f"Discovered {ip} ({rdns})")
+        else:
+            host = self._by_ip[ip]
+            # Pre-seeded hosts pick up the name nmap resolved
+            if name and not host.get('hostname'):
+                host['hostname'] = name
+        mac = elem.find("address[@addrtype='mac']")
+        if mac is not None:
+            apply_mac(host, mac.get('addr', '').upper(), mac.get('vendor'))
+        return host
\ No newline at end of file
@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 import os, re
 
+_LEADING_DIGITS = re.compile(r'^\d+')
+# Runs of non-word characters and underscores, so separators collapse in the same pass
+_SEPARATORS = re.compile(r'[\W_]+')
+
 def slugify(name):
     # 1) Strip leading digits
-    name = re.sub(r'^\d+', '', name)
-    # 2) Replace any non‐alphanumeric with underscore
-    name = re.sub(r'[^\w]+', '_', name)
-    # 3) Collapse multiple underscores
-    name = re.sub(r'__+', '_', name)
-    # 4) Trim leading/trailing underscores and lowercase
+    name = _LEADING_DIGITS.sub('', name)
+    # 2) Replace each run of non-alphanumerics/underscores with one underscore
+    name = _SEPARATORS.sub('_', name)
+    # 3) Trim leading/trailing underscores and lowercase
     return name.strip('_').lower()
 
 if __name__ == '__main__':
@@ -1,10 +1,20 @@
+import array
+import asyncio
+import mmap
 import os
 import re
-import socket
-import subprocess
 import shutil
 import logging
-from PyQt6.QtCore import QThread, pyqtSignal
+import threading
+import time
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from scanning import get_privilege_wrapper, load_cached_table
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 
 log = logging.getLogger(__name__)
 
@@ -12,10 +22,36 @@ log = logging.getLogger(__name__)
 import os
 import logging
 
+# name, port for every non-comment /tcp entry in nmap-services
+_NMAP_SERVICES_RX = re.compile(rb'^(?!#)(\S+)\s+(\d+)/tcp\b', re.MULTILINE)
+# RustScan reports each open port on its own line, with the host it is on
+_OPEN_PORT_RX = re.compile(rb"Discovered open port (?P<port>\d+)/tcp on (?P<ip>\S+)")
+# masscan -oG lines: "Host: <ip> (<name>)\tPorts: <port>/open/tcp//..."
+_MASSCAN_PORT_RX = re.compile(rb"Host: (?P<ip>\S+) .*?Ports: (?P<port>\d+)/open")
+
+def _read_services(path):
+    """(name, port) byte pairs for every /tcp entry of a services-format file."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _NMAP_SERVICES_RX.findall(mm)
+
+def _load_system_services(path='/etc/services'):
+    """Port -> service name from /etc/services; fills names nmap-services lacks."""
+    try:
+        return {int(port): name.decode('utf-8', 'replace') for name, port in _read_services(path)}
+    except (OSError, ValueError):
+        return {}
+
+def _build_service_tables(paths):
+    """(nmap-services ports, port -> name) with nmap-services names over system ones."""
+    svc_file, system_file = paths
+    names = _load_system_services(system_file)
+    matches = _read_services(svc_file)
+    ports = [int(port) for _, port in matches]
+    names.update((port, name.decode('utf-8', 'replace')) for port, (name, _) in zip(ports, matches))
+    return ports, names
+
 def load_top_ports():
     """Load ports from nmap-services; return (all_ports, service_names)"""
-    ports = []
-    names = {}
     service_paths = [
         '/usr/share/nmap/nmap-services',
         '/usr/local/share/nmap/nmap-services',
@@ -24,117 +60,425 @@ def load_top_ports():
     svc_file = next((p for p in service_paths if os.path.exists(p)), None)
     if not svc_file:
         logging.warning("nmap-services file not found; using full TCP range")
-        return list(range(1, 65536)), {}
+        return array.array('H', range(1, 65536)), _load_system_services()
     try:
-        with open(svc_file) as f:
-            for line in f:
-                if line.startswith('#'):
-                    continue
-                parts = line.split()
-                if len(parts) < 2 or '/tcp' not in parts[1]:
-                    continue
-                port = int(parts[1].split('/')[0])
-                ports.append(port)
-                names[port] = parts[0]
+        # Parsed once per nmap-services/etc-services version, then marshal-loaded
+        ports, names = load_cached_table('services', [svc_file, '/etc/services'], _build_service_tables)
     except Exception as e:
         logging.warning(f"Failed to read {svc_file}: {e}")
-        return list(range(1, 65536)), {}
-    return ports, names
+        return array.array('H', range(1, 65536)), _load_system_services()
+    # Unsigned 16-bit array: 2 bytes a port instead of an int object each
+    return array.array('H', ports), names
 
 # Initialize port lists: all common ports and quick top-1000 slice
 COMMON_PORTS, SERVICE_NAMES = load_top_ports()
 QUICK_PORTS = COMMON_PORTS[:1000]
+# RustScan --ports values for the fixed lists, joined once rather than per scan
+COMMON_PORTS_ARG = ",".join(map(str, COMMON_PORTS))
+QUICK_PORTS_ARG = ",".join(map(str, QUICK_PORTS))
+
+def _ports_arg(ports):
+    """RustScan --ports value for ports, reusing the joined fixed lists."""
+    if ports is COMMON_PORTS:
+        return COMMON_PORTS_ARG
+    if ports is QUICK_PORTS:
+        return QUICK_PORTS_ARG
+    return ",".join(map(str, ports))
+
+
+class _PoolTask(QRunnable):
+    """
+    QRunnable for a shared QThreadPool. Signals live on a QObject bridge
+    (QRunnable cannot define them) and are re-exposed as attributes;
+    finished is always emitted when the task ends.
+    """
+    signals_class = None
+
+    def __init__(self):
+        super().__init__()
+        # Callers hold the reference until finished; don't let Qt delete it
+        self.setAutoDelete(False)
+        self.signals = self.signals_class()
+        self.result = self.signals.result
+        self.error = self.signals.error
+        self.finished = self.signals.finished
+
+    def run(self):
+        try:
+            self.execute()
+        finally:
+            self.finished.emit()
+
+    def execute(self):
+        raise NotImplementedError
+
+
+class _ScanSlots:
+    """
+    Counting limiter whose limit can change while tasks hold or wait for
+    slots. Used only on the scan loop thread.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def resize(self, limit):
+        # Running tasks keep their slots; waiters re-check against the new limit
+        self.limit = limit
+        asyncio.ensure_future(self._wake())
+
+    async def _wake(self):
+        async with self._cond:
+            self._cond.notify_all()
+
+
+class _ScanLoop:
+    """
+    One background thread running an asyncio loop. Subprocess-bound tasks
+    await their nmap/RustScan processes there, so any number of scans in
+    flight costs one thread instead of one pool thread each.
+    """
+    _loop = None
+    _lock = threading.Lock()
+    # Tasks allowed to run their process at once; the rest queue for a slot
+    _limit = 8
+    _slots = None
+
+    @classmethod
+    def submit(cls, coro):
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                threading.Thread(target=cls._loop.run_forever, name='scan-loop', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, cls._loop)
+
+    @classmethod
+    def slot(cls):
+        # Only called on the loop thread
+        if cls._slots is None:
+            cls._slots = _ScanSlots(cls._limit)
+        return cls._slots
+
+    @classmethod
+    def _resize(cls, limit):
+        # Runs on the loop thread, which owns the limiter
+        cls._limit = limit
+        if cls._slots is not None:
+            cls._slots.resize(limit)
+
+
+def set_max_concurrency(n):
+    """Limit how many scan tasks run at once; a slot is reused as soon as any task ends."""
+    n = max(1, int(n))
+    with _ScanLoop._lock:
+        if _ScanLoop._loop is None:
+            # No loop yet: the limiter is created with this limit
+            _ScanLoop._limit = n
+        else:
+            _ScanLoop._loop.call_soon_threadsafe(_ScanLoop._resize, n)
 
-def get_privilege_wrapper():
-    return shutil.which('doas') or shutil.which('sudo') if os.geteuid() != 0 else None
 
+class _AsyncTask:
+    """
+    Counterpart of _PoolTask whose execute() is a coroutine run on the
+    shared scan loop. Signals use the same QObject bridge; they are emitted
+    from the loop thread and delivered queued to the GUI thread.
+    """
+    signals_class = None
 
-class OSDetectThread(QThread):
-    result = pyqtSignal(str, dict)
-    error  = pyqtSignal(str)
+    def __init__(self):
+        self.signals = self.signals_class()
+        self.result = self.signals.result
+        self.error = self.signals.error
+        self.finished = self.signals.finished
 
-    def __init__(self, ip, nmap_path, parent=None):
-        super().__init__(parent)
-        self.ip = ip.strip()
+    def start(self):
+        _ScanLoop.submit(self._run())
+
+    async def _run(self):
+        try:
+            async with _ScanLoop.slot():
+                await self.execute()
+        finally:
+            self.finished.emit()
+
+    async def execute(self):
+        raise NotImplementedError
+
+
+class OSDetectSignals(QObject):
+    result   = pyqtSignal(str, dict)
+    error    = pyqtSignal(str)
+    finished = pyqtSignal()
+
+class OSDetectTask(_AsyncTask):
+    """
+    OS detection for one host or many. Several hosts go to a single nmap
+    run via an -iL target list, and results stream out per <host> element.
+    """
+    signals_class = OSDetectSignals
+
+    def __init__(self, ips, nmap_path):
+        super().__init__()
+        if isinstance(ips, str):
+            ips = [ips]
+        self.ips = [ip.strip() for ip in ips]
+        self.ip = ", ".join(self.ips)
         self.nmap_path = nmap_path
         self.wrapper = get_privilege_wrapper()
+        # nmap scans the batch in parallel; allow extra time for large lists
+        self.timeout = 60 if len(self.ips) == 1 else 300
 
-    def run(self):
-        cmd = [self.nmap_path, '-O', '-oX', '-', self.ip]
+    async def execute(self):
+        cmd = [self.nmap_path, '-O', '-T4', '-oX', '-']
+        if len(self.ips) == 1:
+            cmd.append(self.ips[0])
+        else:
+            # Target list on stdin: no temp file to write and remove
+            cmd += ['-iL', '-']
         if self.wrapper:
             cmd = [self.wrapper] + cmd
+        feeder = None
         try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                stdin=asyncio.subprocess.PIPE if len(self.ips) > 1 else None
+            )
+            if proc.stdin:
+                feeder = asyncio.ensure_future(self._feed_targets(proc.stdin))
+            pending = set(self.ips)
+            try:
+                stderr = await asyncio.wait_for(self._read_results(proc, pending), self.timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise RuntimeError(f"nmap timed out after {self.timeout} s")
             if proc.returncode != 0:
-                raise RuntimeError(proc.stderr.strip())
-            # parse XML for OS match
-            from xml.etree import ElementTree as ET
-            root = ET.fromstring(proc.stdout)
-            match = root.find("host/os/osmatch")
-            if match is not None:
-                name = match.attrib.get("name","Unknown")
-                accuracy = match.attrib.get("accuracy","")
-                self.result.emit(self.ip, {"os":name,"accuracy":accuracy})
-                return
-            self.result.emit(self.ip, {"os":"Unknown","accuracy":""})
+                # stderr is only decoded when it is reported
+                raise RuntimeError(stderr.decode('utf-8', errors='replace').strip()
+                                   or f"nmap exited with status {proc.returncode}")
+            # Hosts nmap never reported (e.g. down) get no match
+            for ip in pending:
+                self.result.emit(ip, {"os":"Unknown","accuracy":""})
         except Exception as e:
             self.error.emit(f"OS detection failed for {self.ip}: {e}")
+        finally:
+            if feeder:
+                feeder.cancel()
+
+    async def _feed_targets(self, stdin):
+        """Write the target list for -iL - while nmap is already running."""
+        try:
+            stdin.write(("\n".join(self.ips) + "\n").encode())
+            await stdin.drain()
+            stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # nmap exited early; its exit status reports why
+            pass
+
+    async def _read_results(self, proc, pending):
+        """Parse nmap's XML as it streams in, emitting each host's OS match; return raw stderr."""
+        parser = ET.XMLPullParser(events=('end',))
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+        try:
+            while chunk := await proc.stdout.read(65536):
+                # Every requested host is reported; the rest is run stats, so just drain it
+                if not pending:
+                    continue
+                parser.feed(chunk)
+                for _, elem in parser.read_events():
+                    if elem.tag != 'host':
+                        continue
+                    addr = elem.find("address[@addrtype='ipv4']")
+                    if addr is None:
+                        addr = elem.find("address")
+                    ip = addr.get("addr") if addr is not None else None
+                    match = elem.find("os/osmatch")
+                    if ip:
+                        if match is not None:
+                            name = match.attrib.get("name","Unknown")
+                            accuracy = match.attrib.get("accuracy","")
+                            self.result.emit(ip, {"os":name,"accuracy":accuracy})
+                        else:
+                            self.result.emit(ip, {"os":"Unknown","accuracy":""})
+                        pending.discard(ip)
+                    elem.clear()
+            stderr = await stderr_task
+            await proc.wait()
+        finally:
+            stderr_task.cancel()
+        return stderr
+
+# Scanner notes that its open-file limit is capping the batch size
+_FD_WARNING_RX = re.compile(rb"^.*(?:file limit|too many open files|ulimit).*$", re.IGNORECASE | re.MULTILINE)
+
+# Port lists longer than this go to masscan's raw SYN scan when it is installed
+_MASSCAN = shutil.which('masscan')
+_MASSCAN_MIN_PORTS = 5000
+
+# Recent port scan results: (ip, --ports value) -> (time scanned, services).
+# Rescanning a host with the same port list within the TTL reuses the result
+_SCAN_CACHE = {}
+_SCAN_TTL = 600
 
-class HostPortThread(QThread):
-    result = pyqtSignal(str, list)   # ip, [ {port:,name:}, ... ]
-    error  = pyqtSignal(str)
+class HostPortSignals(QObject):
+    result   = pyqtSignal(str, list)   # ip, [ {port:,name:}, ... ]
+    port_found = pyqtSignal(str, int, str)   # ip, port, name as each is reported
+    warning  = pyqtSignal(str, str)    # ip(s), scanner message worth showing the user
+    error    = pyqtSignal(str)
+    finished = pyqtSignal()
 
-    def __init__(self, ip, rs_path, parent=None, quick=False, custom_ports=None):
-        super().__init__(parent)
-        self.ip = ip.strip()
+class HostPortTask(_AsyncTask):
+    """
+    Port scan for one host or many. Several hosts share a single RustScan
+    run; its output is split per host and one result is emitted per IP.
+    """
+    signals_class = HostPortSignals
+
+    def __init__(self, ips, rs_path, ports, force=False):
+        super().__init__()
+        if isinstance(ips, str):
+            ips = [ips]
+        self.ips = [ip.strip() for ip in ips]
+        self.ip = ", ".join(self.ips)
+        # RustScan works through the batch in parallel; allow extra time for large lists
+        self.timeout = 120 if len(self.ips) == 1 else 600
         self.rs_path = rs_path
         self.wrapper = get_privilege_wrapper()
-        self.quick = quick
-        self.custom_ports = custom_ports
+        # Chosen by the caller in the GUI thread; the task never touches widgets
+        self.ports_arg = _ports_arg(ports)
+        self.port_count = len(ports)
+        # Scan even hosts with a cached result
+        self.force = force
+        self.port_found = self.signals.port_found
+        self.warning = self.signals.warning
 
-    def run(self):
-        clean_ip = self.ip
-        parent = self.parent()
-        # decide ports: custom overrides UI; then advanced/quick based on radio buttons
-        if self.custom_ports is not None:
-            ports = self.custom_ports
-        elif hasattr(parent, 'advanced_rb') and parent.advanced_rb.isChecked():
-            ports = COMMON_PORTS
-        elif hasattr(parent, 'quick_rb') and parent.quick_rb.isChecked():
-            ports = QUICK_PORTS
-        else:
-            # fallback to top 1000 if UI widgets not found
-            ports = QUICK_PORTS
+    async def execute(self):
+        ports_arg = self.ports_arg
+        # Hosts scanned recently with the same ports are answered from the cache
+        targets = []
+        now = time.monotonic()
+        for ip in self.ips:
+            entry = None if self.force else _SCAN_CACHE.get((ip, ports_arg))
+            if entry and now - entry[0] < _SCAN_TTL:
+                self.result.emit(ip, entry[1])
+            else:
+                targets.append(ip)
+        if not targets:
+            return
         # build cmd
-        base = [self.rs_path, "--accessible", "-a", clean_ip, "--ulimit", "5000"]
-        base += ["--ports", ",".join(str(p) for p in ports)]
+        if _MASSCAN and self.port_count > _MASSCAN_MIN_PORTS:
+            base = [_MASSCAN, "-p", ports_arg, "--rate", "10000", "-oG", "-", *targets]
+            port_rx = _MASSCAN_PORT_RX
+            scanner = "masscan"
+        else:
+            base = [self.rs_path, "--accessible", "-a", ",".join(targets), "--ulimit", "5000"]
+            base += ["--ports", ports_arg]
+            port_rx = _OPEN_PORT_RX
+            scanner = "RustScan"
         cmd = ([self.wrapper] + base) if self.wrapper else base
         log.debug("PortThread CMD: " + " ".join(cmd))
         try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            # Bucket ports by host; every requested host gets a result
+            found = {ip.encode(): set() for ip in targets}
+            try:
+                warnings = {}
+                stderr = await asyncio.wait_for(self._read_ports(proc, found, port_rx, warnings), self.timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise RuntimeError(f"{scanner} timed out after {self.timeout} s")
+            for m in _FD_WARNING_RX.finditer(stderr):
+                warnings[m.group(0).strip()] = None
+            # Each distinct note once, even when the run then failed
+            for text in warnings:
+                self.warning.emit(self.ip, text.decode('utf-8', errors='replace'))
             if proc.returncode != 0:
-                raise RuntimeError(proc.stderr.strip())
-            found = []
-            for line in proc.stdout.splitlines():
-                m = re.search(r"Discovered open port (\d+)/tcp", line)
-                if m:
-                    p = int(m.group(1))
-                    found.append(p)
-            # lookup service names
-            services = []
-            for p in sorted(set(found)):
-                try:
-                    name = socket.getservbyport(p)
-                except:
-                    name = ''
-                services.append({"port":p, "name":name})
-            self.result.emit(clean_ip, services)
+                # masscan reports some failures (e.g. permissions) on stdout only
+                raise RuntimeError(stderr.decode('utf-8', errors='replace').strip()
+                                   or f"{scanner} exited with status {proc.returncode}")
+            now = time.monotonic()
+            for ip in targets:
+                services = [{"port": p, "name": SERVICE_NAMES.get(p, '')} for p in sorted(found[ip.encode()])]
+                _SCAN_CACHE[(ip, ports_arg)] = (now, services)
+                self.result.emit(ip, services)
         except Exception as e:
-            self.error.emit(f"Port scan failed for {clean_ip}: {e}")
-    # Accept either a dict with "ports" or a raw list
-    def on_host_ports_multi(self, ip, data):
-        # Accept either a dict with "ports" or a raw list
-        if isinstance(data, dict) and 'ports' in data:
-            ports = data['ports']
-        else:
-            ports = data or []
\ No newline at end of file
+            self.error.emit(f"Port scan failed for {self.ip}: {e}")
+
+    async def _read_ports(self, proc, found, port_rx, warnings):
+        """
+        Collect open ports as the scanner reports them, announcing each, and
+        gather file-limit notes into warnings; return raw stderr.
+        """
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+        tail = b''
+        try:
+            # Raw bytes: each chunk's complete lines get one regex pass without decoding
+            while chunk := await proc.stdout.read(65536):
+                buf = tail + chunk
+                cut = buf.rfind(b'\n') + 1
+                tail = buf[cut:]
+                for m in port_rx.finditer(buf, 0, cut):
+                    self._add_port(m, found)
+                for m in _FD_WARNING_RX.finditer(buf, 0, cut):
+                    warnings[m.group(0).strip()] = None
+            for m in port_rx.finditer(tail):
+                self._add_port(m, found)
+            for m in _FD_WARNING_RX.finditer(tail):
+                warnings[m.group(0).strip()] = None
+            stderr = await stderr_task
+            await proc.wait()
+        finally:
+            stderr_task.cancel()
+        return stderr
+
+    def _add_port(self, m, found):
+        """Record one open-port match for a requested host, announcing it the first time."""
+        ip = m['ip']
+        if ip in found:
+            port = int(m['port'])
+            ports = found[ip]
+            if port not in ports:
+                ports.add(port)
+                # Service names come from the tables loaded at import, not NSS
+                self.port_found.emit(ip.decode(), port, SERVICE_NAMES.get(port, ''))
+
+
+class MDNSMergeSignals(QObject):
+    result   = pyqtSignal(object)
+    error    = pyqtSignal(str)
+    finished = pyqtSignal()
+
+
+class MDNSMergeTask(_PoolTask):
+    """Runs merge(hosts, results) on the pool and emits the merged host list."""
+    signals_class = MDNSMergeSignals
+
+    def __init__(self, hosts, results, merge, generation=0):
+        super().__init__()
+        self.hosts = hosts
+        self.results = results
+        self.merge = merge
+        # Scan this merge belongs to, so the window can ignore stale results
+        self.generation = generation
+
+    def execute(self):
+        try:
+            self.result.emit(self.merge(self.hosts, self.results))
+        except Exception as e:
+            self.error.emit(f"mDNS merge failed: {e}")